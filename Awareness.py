@@ -3,8 +3,9 @@
 # ---------------------------------------------------------
 # Responsibilities:
 #   1. Maintain a self-description (self.json)
-#   2. Read past logs (events.jsonl) and summarize reflections
-#   3. Store persistent "memory" and "goals" for continuity
+#   2. Read past logs (events.jsonl) and summarize reflections from
+#      per-minute event counters (event_counts.json)
+#   3. Store persistent "memory" and "goals" for continuity (memory.db)
 #   4. Provide a simple interface other modules can call
 #
 # Usage:
@@ -13,26 +14,82 @@
 #   j.reflect()               # produce a self-summary
 #   j.update_self({"mood": "focused"})
 #   print(j.compose_context())  # returns a dict usable in LLM prompts
+#   j.close()                 # flush buffered events and state (or use `with JarvisAwareness() as j:`)
 
+import atexit
 import json
+import threading
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
-import ollama  # same local model backend
-import textwrap
+from awareness_events import EventCounters, EventIndex, EventWriter, segments
+from awareness_backend import resolve_backend
+from awareness_store import MemoryStore
+
+
+def _member_chars(key, value):
+    # Length of `"key": value` as one member of a top-level dict dumped with indent=2
+    return len(json.dumps({key: value}, indent=2, ensure_ascii=False)) - 4
+
 
 class JarvisAwareness:
-    def __init__(self, base_dir: Path | None = None):
+    def __init__(self, base_dir: Path | None = None, event_buffer_bytes: int = 64 * 1024,
+                 event_flush_interval: float = 1.0, event_segment_bytes: int = 64 * 1024 * 1024,
+                 event_compression: str | None = None, save_debounce: float = 2.0,
+                 context_chars: int = 12000, context_summaries: int = 5,
+                 backend=None, summary_chunk_chars: int = 8000, summary_workers: int = 4):
         # Use the same .jarvis directory as backend.py
         self.app_dir = Path(base_dir or Path.cwd() / ".jarvis")
         self.app_dir.mkdir(parents=True, exist_ok=True)
 
         self.self_path = self.app_dir / "self.json"
-        self.memory_path = self.app_dir / "memory.json"
+        self.memory_path = self.app_dir / "memory.db"
+        self.legacy_memory_path = self.app_dir / "memory.json"
         self.events_path = self.app_dir / "events.jsonl"
         self.reflection_path = self.app_dir / "reflections.txt"
+        self.counts_path = self.app_dir / "event_counts.json"
+        self.event_index = EventIndex(self.events_path)
+        # Counted by the writer as events are logged and saved on its flush timer
+        self.event_counts = EventCounters(self.counts_path)
+        if not self.event_counts.load(self.events_path):
+            self.event_counts.backfill(self.events_path)
+        if self.event_counts.dirty:
+            self.event_counts.save()
+        self.event_writer = EventWriter(
+            self.events_path,
+            buffer_bytes=event_buffer_bytes,
+            flush_interval=event_flush_interval,
+            max_bytes=event_segment_bytes,
+            compression=event_compression,
+            on_rotate=self.event_index.reset,
+            counters=self.event_counts,
+        )
 
+        # self.json writes are coalesced: changes mark it dirty and it is
+        # written at most once per save_debounce seconds, by a timer for the
+        # trailing change, or on flush()
+        self.save_debounce = save_debounce
+        self._self_lock = threading.RLock()
+        self._self_timer = None
+        self._self_dirty = False
+        self._self_saved = 0.0
         self._self = self._load_or_init_self()
-        self._memory = self._load_json(self.memory_path)
+        self._memory = MemoryStore(self.memory_path, legacy_json=self.legacy_memory_path)
+
+        # compose_context() is cached until self/memory change
+        self.context_chars = context_chars
+        self.context_summaries = context_summaries
+        self._context = None
+
+        # Model backend (see awareness_backend.py); ollama is only imported
+        # on the first model call
+        self.chat = resolve_backend(backend)
+        self.summary_chunk_chars = summary_chunk_chars
+        self.summary_workers = summary_workers
+        # Flushed at interpreter exit unless closed before; close() drops
+        # the registration so closed instances can be freed
+        self._closed = False
+        atexit.register(self.close)
 
     # -----------------------------------------------------
     # Core loading and persistence
@@ -49,17 +106,77 @@ class JarvisAwareness:
         tmp = path.with_suffix(".tmp")
         tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
         tmp.replace(path)
-        
+
+    def _touch_self(self):
+        with self._self_lock:
+            self._self_dirty = True
+            wait = self.save_debounce - (time.monotonic() - self._self_saved)
+            if wait <= 0:
+                self._save_self()
+            elif self._self_timer is None:
+                self._self_timer = threading.Timer(wait, self._flush_self)
+                self._self_timer.daemon = True
+                self._self_timer.start()
+
+    def _flush_self(self):
+        with self._self_lock:
+            if self._self_dirty:
+                self._save_self()
+            self._self_timer = None
+
+    def _save_self(self):
+        # Caller holds _self_lock
+        if self._self_timer is not None:
+            self._self_timer.cancel()
+            self._self_timer = None
+        self._save_json(self.self_path, self._self)
+        self._self_dirty = False
+        self._self_saved = time.monotonic()
+
     def log_event(self, event_type: str, details: dict | None = None, level="INFO"):
         """Write a simulation event into events.jsonl for memory/reflection."""
+        now = datetime.now()
         entry = {
-            "ts": datetime.now().isoformat(timespec="seconds"),
+            "ts": now.isoformat(timespec="seconds"),
             "event": event_type,
             "level": level,
             "data": details or {},
         }
-        with self.events_path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.event_writer.write(entry)
+
+    def flush_events(self):
+        self.event_writer.flush()
+
+    def flush(self):
+        """Write out everything buffered: events, event counters and self.json."""
+        self.event_writer.flush(counts=True)
+        self._flush_self()
+
+    def close(self):
+        """Flush everything and release files and memory.db; safe to call twice."""
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        self.flush()
+        self.event_writer.close()
+        self._memory.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def events_since(self, lookback_hours: float = 12, limit: int | None = None) -> list[dict]:
+        """Raw events of the last `lookback_hours`, at most the last `limit` of them."""
+        self.event_writer.flush()
+        return self.event_index.records_since(datetime.now() - timedelta(hours=lookback_hours), limit=limit)
+
+    def recent_events(self, n: int = 50) -> list[dict]:
+        """Last n events, reaching back into rotated segments when the active file holds fewer."""
+        self.event_writer.flush()
+        return self.event_index.records_since(limit=n)
 
     def _load_or_init_self(self) -> dict:
         if self.self_path.exists():
@@ -88,45 +205,38 @@ class JarvisAwareness:
 
     def update_self(self, updates: dict):
         """Merge updates into self.json"""
-        self._self.update(updates)
-        self._self["last_updated"] = datetime.now().isoformat(timespec="seconds")
-        self._save_json(self.self_path, self._self)
+        with self._self_lock:
+            self._self.update(updates)
+            self._self["last_updated"] = datetime.now().isoformat(timespec="seconds")
+            self._touch_self()
+        self._context = None
         return self._self
 
     # -----------------------------------------------------
     # Reflection from events
     # -----------------------------------------------------
     def reflect(self, lookback_hours: int = 12):
-        """Summarize recent events.jsonl into a reflection paragraph."""
-        if not self.events_path.exists():
+        """Summarize recent events into a reflection paragraph."""
+        self.flush_events()
+        if not self.events_path.exists() and not segments(self.events_path):
             reflection = "No events found. Jarvis remains in initial state."
         else:
-            cutoff = datetime.now() - timedelta(hours=lookback_hours)
-            lines = []
-            for line in self.events_path.read_text(encoding="utf-8").splitlines()[-500:]:
-                try:
-                    obj = json.loads(line)
-                    ts = datetime.fromisoformat(obj.get("ts", datetime.now().isoformat()))
-                    if ts >= cutoff:
-                        lines.append(obj)
-                except Exception:
-                    continue
-            reflection = self._summarize_events(lines) if lines else "Quiet period. No recent activity."
+            counts = self.event_counts.since(datetime.now() - timedelta(hours=lookback_hours))
+            reflection = self._summarize_counts(counts) if counts else "Quiet period. No recent activity."
 
         # Save reflection
         stamp = datetime.now().strftime("%Y-%m-%d %H:%M")
         with self.reflection_path.open("a", encoding="utf-8") as f:
             f.write(f"[{stamp}] {reflection}\n")
-        self._self["last_reflection"] = stamp
-        self._save_json(self.self_path, self._self)
+        with self._self_lock:
+            self._self["last_reflection"] = stamp
+            self._touch_self()
+        self._context = None
         return reflection
 
-    def _summarize_events(self, events: list[dict]) -> str:
+    def _summarize_counts(self, types: dict[str, int]) -> str:
         """Basic summarizer without model calls (simple statistics)."""
-        types = {}
-        for e in events:
-            types[e.get("event", "unknown")] = types.get(e.get("event", "unknown"), 0) + 1
-        total = len(events)
+        total = sum(types.values())
         top = sorted(types.items(), key=lambda x: x[1], reverse=True)
         summary = ", ".join(f"{k}: {v}" for k, v in top[:5])
         return f"In the last period Jarvis handled {total} events. Most frequent: {summary}."
@@ -134,78 +244,107 @@ class JarvisAwareness:
     def summarize_conversation(self, convo_path: Path, model="qwen2.5:7b-instruct"):
         """
         Summarize the entire file into a short paragraph which highlights all the points discussed throughout the conversation in a way that is easy to read and understand exactly what was discussed in the conversation.(without any formatting)
-        The summary is saved in memory.json for long-term context.
+        Long conversations are summarised in chunks and merged (see awareness_summary.py); model results are cached,
+        so only new messages cost model calls. The summary is saved in memory.db for long-term context.
         """
+        convo, result = self._summarize(convo_path, model)
+        return self._store_summary(convo, result)
+
+    def _summarize(self, convo_path: Path, model):
+        # The model calls; touches nothing but the (locked) summary cache in memory.db
         if not convo_path.exists():
             raise FileNotFoundError(f"No such conversation: {convo_path}")
 
-        convo = json.loads(convo_path.read_text(encoding="utf-8"))
-        messages = convo.get("messages", [])
-        joined = "\n".join(
-            f"{m['role'].capitalize()}: {m['content'].strip()}"
-            for m in messages if m["role"] != "system"
-        )
+        from awareness_summary import ConversationSummarizer  # thread pool machinery only when summarising
 
-        prompt = (
-            "Summarize the following conversation between a user and an AI assistant "
-            "into a clear, plain paragraph of 500–1000 words. "
-            "Avoid bullet points, lists, markdown, or headings. "
-            "Write it as a natural narrative focusing on what was discussed, "
-            "the user's intentions, the assistant's responses, and any facts learned.\n\n"
-            f"{joined}"
+        convo = json.loads(convo_path.read_text(encoding="utf-8"))
+        summarizer = ConversationSummarizer(
+            self.chat, model, cache=self._memory, chunk_chars=self.summary_chunk_chars, workers=self.summary_workers,
         )
+        return convo, summarizer.summarize(convo.get("id") or convo_path.stem, convo.get("messages", []))
 
-        response = ollama.chat(model=model, messages=[
-            {"role": "system", "content": "You are an AI that writes natural language summaries for memory retention."},
-            {"role": "user", "content": prompt},
-        ])
+    def _store_summary(self, convo, result):
+        if result.cached:
+            return result.text  # unchanged conversation, already in memory
 
-        summary = (
-            response.get("message", {}).get("content", "").replace("\n", " ").strip()
-            or "(No summary generated.)"
-        )
-
-        # Save to memory.json
+        # Save to memory.db
         entry = {
             "timestamp": datetime.now().isoformat(timespec="seconds"),
             "conversation_id": convo.get("id"),
             "title": convo.get("title"),
-            "summary": summary,
+            "summary": result.text,
         }
-        self._memory.setdefault("conversation_summaries", []).append(entry)
-        self._save_json(self.memory_path, self._memory)
-        return summary
+        self._memory.add_summary(entry)
+        self._context = None
+        return result.text
 
     # -----------------------------------------------------
     # Context for model usage
     # -----------------------------------------------------
     def compose_context(self) -> dict:
-        """Return a context object to feed into LLM system messages."""
-        self_state = json.dumps(self._self, indent=2, ensure_ascii=False)
-        memory_state = json.dumps(self._memory, indent=2, ensure_ascii=False)
-        return {
-            "role": "system",
-            "content": (
-                f"Jarvis internal awareness:\n"
-                f"- Identity:\n{self_state}\n"
-                f"- Memory snapshot:\n{memory_state}\n"
-                f"- Reflection file: {self.reflection_path}\n"
-                f"Use this self-awareness to maintain continuity, mood, and goals."
-            )
-        }
+        """Return a context object to feed into LLM system messages.
+
+        The whole message stays within `context_chars`: the identity from
+        self.json comes first, then the latest `context_summaries`
+        conversation summaries, newest first, then the most recently
+        remembered values, each as far as it still fits (the fixed frame
+        around them, about 220 characters, is always there). The result is
+        cached until update_self, remember, reflect or
+        summarize_conversation change what it is built from.
+        """
+        if self._context is None:
+            self._context = self._build_context()
+        return dict(self._context)
+
+    def _build_context(self) -> dict:
+        head = "Jarvis internal awareness:\n- Identity:\n"
+        middle = "\n- Memory snapshot:\n"
+        tail = (
+            f"\n- Reflection file: {self.reflection_path}\n"
+            f"Use this self-awareness to maintain continuity, mood, and goals."
+        )
+        # Everything is sized exactly as json.dumps(indent=2) will write it;
+        # the identity gets the budget first, then recent summaries, then
+        # remembered values, most recent first. Whatever does not fit is
+        # skipped so smaller entries behind it still get in.
+        budget = self.context_chars - len(head) - len(middle) - len(tail)
+        budget -= 2 + 4  # "{}" for the identity, "{\n" "\n}" around the snapshot
+        identity = {}
+        for key, value in self._self.items():
+            cost = _member_chars(key, value) + 2
+            if cost <= budget:
+                identity[key] = value
+                budget -= cost
+        summaries = []
+        budget -= _member_chars("conversation_summaries", summaries)
+        for entry in reversed(self._memory.summaries(limit=self.context_summaries)):
+            cost = _member_chars("conversation_summaries", summaries + [entry]) - _member_chars("conversation_summaries", summaries)
+            if cost <= budget:
+                summaries.append(entry)
+                budget -= cost
+        snapshot = {}
+        for key, value in self._memory.recent_items():
+            cost = _member_chars(key, value) + 2
+            if cost <= budget:
+                snapshot[key] = value
+                budget -= cost
+        snapshot["conversation_summaries"] = summaries
+        self_state = json.dumps(identity, indent=2, ensure_ascii=False)
+        memory_state = json.dumps(snapshot, indent=2, ensure_ascii=False)
+        return {"role": "system", "content": head + self_state + middle + memory_state + tail}
 
     # -----------------------------------------------------
     # Optional: direct memory helpers
     # -----------------------------------------------------
     def remember(self, key: str, value: str):
-        self._memory[key] = value
-        self._save_json(self.memory_path, self._memory)
+        self._memory.set(key, value)
+        self._context = None
 
     def recall(self, key: str):
         return self._memory.get(key)
 
     def all_memories(self) -> dict:
-        return self._memory
+        return self._memory.as_dict()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,261 @@
+# array_engine.py
+# Structure-of-arrays battle engine for large rosters (battle royales of
+# 10k+ combatants) and for many independent battles at once. Every stat
+# lives in one NumPy array of shape (battles, combatants) and a whole turn
+# of potion use, choose_action, attack resolution and take_damage is
+# resolved as vectorised operations over every battle in lock-step.
+#
+# The rules are Entity's (entity.py / attack_types.py). Turns are resolved
+# simultaneously: every living combatant acts on the state at the start of
+# the turn and damage lands at the end of it. Gods, cosmic events and the
+# Priest / Mechanist / Intern specials are not modelled here.
+
+import argparse
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+import numpy as np
+from policy import ACTION_WEIGHTS, policy_for
+from attack_types import attack_kernel, attack_table
+
+DEFAULTS = {
+    "max_health": 120, "attack": 25, "defense": 8, "healing_ability": 20,
+    "max_mana": 100, "mana_cost": 25, "special_attack_damage": 45,
+    "karma": 50, "max_stamina": 100, "accuracy": 0.8, "evasion": 0.1,
+}
+INVENTORY = {"health_potion": 2, "mana_potion": 2, "stamina_boost": 1}
+STATE = (*DEFAULTS, "health", "mana", "stamina", *INVENTORY)
+
+# Action codes, in Entity.choose_action order. NONE marks a turn spent on a potion.
+HEAL, REST, HEAVY, MAGIC, QUICK, NORMAL, DEFEND, NONE = range(8)
+ACTIONS = ("heal", "rest", "heavy_attack", "magic_attack", "quick_attack", "normal_attack", "defend", "none")
+ACTION_POLICY = policy_for(ACTION_WEIGHTS, "defend")
+
+# The attack catalogue (attack_types.CATALOGUE) as columns indexed by action code
+ATTACK_TABLE = attack_table(ACTIONS)
+
+
+class ArrayRoster:
+    """Combatant state for `batch` independent battles of `size` combatants each.
+
+    Every stat is an array of shape (batch, size); the turn kernel works on
+    flat views of them.
+    """
+
+    def __init__(self, columns):
+        self.shape = columns["max_health"].shape
+        self.batch, self.size = self.shape
+        self.max_health = columns["max_health"]
+        self.health = self.max_health.copy()
+        self.attack = columns["attack"]
+        self.defense = columns["defense"]
+        self.healing_ability = columns["healing_ability"]
+        self.max_mana = columns["max_mana"]
+        self.mana = self.max_mana.copy()
+        self.mana_cost = columns["mana_cost"]
+        self.special_attack_damage = columns["special_attack_damage"]
+        self.karma = columns["karma"]
+        self.max_stamina = columns["max_stamina"]
+        self.stamina = self.max_stamina.copy()
+        self.accuracy = columns["accuracy"]
+        self.evasion = columns["evasion"]
+        self.health_potion = np.full(self.shape, INVENTORY["health_potion"], dtype=np.int32)
+        self.mana_potion = np.full(self.shape, INVENTORY["mana_potion"], dtype=np.int32)
+        self.stamina_boost = np.full(self.shape, INVENTORY["stamina_boost"], dtype=np.int32)
+
+    @classmethod
+    def repeat(cls, size, config=None, batch=1):
+        """`size` identical combatants built from one entity.py style config."""
+        config = {**DEFAULTS, **(config or {})}
+        return cls({key: np.full((batch, size), config[key], dtype=np.float64) for key in DEFAULTS})
+
+    @classmethod
+    def from_configs(cls, configs, batch=1):
+        """One combatant per config, the same line-up repeated in every battle."""
+        configs = [{**DEFAULTS, **c} for c in configs]
+        return cls({
+            key: np.tile(np.array([c[key] for c in configs], dtype=np.float64), (batch, 1))
+            for key in DEFAULTS
+        })
+
+    def alive(self):
+        return self.health > 0
+
+    def alive_per_battle(self):
+        return np.count_nonzero(self.health > 0, axis=1)
+
+
+@dataclass
+class RoyaleResult:
+    winner: int | None
+    turns: int
+    survivors: int
+
+@dataclass
+class DuelResult:
+    battles: int
+    wins_a: int
+    wins_b: int
+    mean_turns: float
+
+    @property
+    def draws(self):
+        return self.battles - self.wins_a - self.wins_b
+
+    @property
+    def win_probability_a(self):
+        return self.wins_a / self.battles
+
+    @property
+    def win_probability_b(self):
+        return self.wins_b / self.battles
+
+
+def choose_actions(health_ratio, stamina, mana, mana_cost, rng):
+    """Vectorised Entity.choose_action: one alias-table draw per row (see policy.py)."""
+    return ACTION_POLICY.sample_batch(health_ratio < 0.4, stamina, mana >= mana_cost, rng)
+
+def pick_targets(actors, size, batch, rng):
+    """A uniformly random other living combatant in the same battle for every actor.
+
+    `actors` are flat indices in ascending order. Returns the actors that
+    have at least one opponent left, and their targets.
+    """
+    battle = actors // size
+    keep = np.bincount(battle, minlength=batch)[battle] >= 2
+    actors, battle = actors[keep], battle[keep]
+    alive = np.bincount(battle, minlength=batch)
+    starts = (np.cumsum(alive) - alive)[battle]
+    alive = alive[battle]
+    position = np.arange(actors.size) - starts
+    offsets = 1 + (rng.random(actors.size) * (alive - 1)).astype(np.intp)
+    return actors, actors[starts + (position + offsets) % alive]
+
+def resolve_turn(roster, rng):
+    """Advance every unfinished battle in `roster` by one turn."""
+    r = SimpleNamespace(**{name: getattr(roster, name).reshape(-1) for name in STATE})
+    actors, targets = pick_targets(np.flatnonzero(r.health > 0), roster.size, roster.batch, rng)
+    count = actors.size
+    if count == 0:
+        return
+
+    health = r.health[actors]
+    mana = r.mana[actors]
+    stamina = r.stamina[actors]
+    karma = r.karma[actors]
+    max_health = r.max_health[actors]
+    max_mana = r.max_mana[actors]
+    max_stamina = r.max_stamina[actors]
+    target_defense = r.defense[targets]
+
+    # Potions take the whole turn, as in Entity.take_turn
+    health_potion = (health < 40) & (r.health_potion[actors] > 0)
+    mana_potion = ~health_potion & (mana < 30) & (r.mana_potion[actors] > 0)
+    stamina_boost = ~health_potion & ~mana_potion & (stamina < 20) & (r.stamina_boost[actors] > 0)
+    health = np.where(health_potion, np.minimum(health + 30, max_health), health)
+    mana = np.where(mana_potion, np.minimum(mana + 25, max_mana), mana)
+    stamina = np.where(stamina_boost, np.minimum(stamina + 20, max_stamina), stamina)
+    r.health_potion[actors[health_potion]] -= 1
+    r.mana_potion[actors[mana_potion]] -= 1
+    r.stamina_boost[actors[stamina_boost]] -= 1
+
+    action = choose_actions(health / max_health, stamina, mana, r.mana_cost[actors], rng)
+    action[health_potion | mana_potion | stamina_boost] = NONE
+
+    heal = action == HEAL
+    healed = np.minimum(r.healing_ability[actors], max_health - health)
+    health = np.where(heal, health + healed, health)
+    karma = karma + 5 * heal
+    stamina = np.where(heal, np.minimum(stamina + 15, max_stamina), stamina)
+
+    rest = action == REST
+    stamina = np.where(rest, np.minimum(stamina + rng.uniform(15, 25, count), max_stamina), stamina)
+    mana = np.where(rest, np.minimum(mana + rng.uniform(5, 10, count), max_mana), mana)
+
+    defend = action == DEFEND
+    r.defense[actors[defend]] += 5
+    stamina = stamina - 5 * defend
+
+    # Attacks the actor cannot afford at the catalogue's cost fizzle, as in
+    # BaseAttack.check_resources (choose_actions gates magic on the
+    # combatant's own mana_cost, which may be lower)
+    broke = (stamina < ATTACK_TABLE["stamina_cost"][action]) | (mana < ATTACK_TABLE["mana_cost"][action])
+    action[broke] = NONE
+
+    # Attacks: pay the cost, then roll to hit and roll damage in the catalogue kernel
+    stamina = stamina - ATTACK_TABLE["stamina_cost"][action]
+    mana = mana - ATTACK_TABLE["mana_cost"][action]
+    hit, karma_lost, damage = attack_kernel(
+        ATTACK_TABLE, action, stamina, max_stamina, r.attack[actors], r.special_attack_damage[actors],
+        r.accuracy[actors], r.evasion[targets], rng,
+    )
+    karma = karma - karma_lost
+    actual = np.maximum(damage - target_defense, 0)
+    incoming = np.bincount(targets[hit], weights=actual[hit], minlength=r.health.size)
+
+    stamina = np.minimum(stamina + rng.uniform(5, 10, count), max_stamina)
+    r.health[actors] = health
+    r.mana[actors] = mana
+    r.stamina[actors] = stamina
+    r.karma[actors] = karma
+    np.maximum(0, r.health - incoming, out=r.health)
+
+def run_royale(roster, max_turns=50, seed=None):
+    """Fight a single battle (batch of 1) until one combatant is left."""
+    rng = np.random.default_rng(seed)
+    turn = 0
+    while turn < max_turns and roster.alive_per_battle()[0] > 1:
+        turn += 1
+        resolve_turn(roster, rng)
+    alive = np.flatnonzero(roster.alive()[0])
+    return RoyaleResult(
+        winner=int(alive[0]) if alive.size == 1 else None,
+        turns=turn,
+        survivors=int(alive.size),
+    )
+
+def run_duels(config_a, config_b, battles=100000, max_turns=50, seed=None):
+    """Run `battles` independent 1v1 duels between two entity.py configs in lock-step.
+
+    Duels that are decided drop out of the kernel; the rest keep fighting
+    until max_turns.
+    """
+    rng = np.random.default_rng(seed)
+    roster = ArrayRoster.from_configs([config_a, config_b], batch=battles)
+    ended = np.full(battles, max_turns)
+    turn = 0
+    running = np.ones(battles, dtype=bool)
+    while turn < max_turns and running.any():
+        turn += 1
+        resolve_turn(roster, rng)
+        finished = running & (roster.alive_per_battle() <= 1)
+        ended[finished] = turn
+        running &= ~finished
+    alive = roster.alive()
+    return DuelResult(
+        battles=battles,
+        wins_a=int(np.count_nonzero(alive[:, 0] & ~alive[:, 1])),
+        wins_b=int(np.count_nonzero(alive[:, 1] & ~alive[:, 0])),
+        mean_turns=float(ended.mean()),
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vectorised battle royale / batched duels")
+    parser.add_argument("--size", type=int, default=10000, help="royale roster size")
+    parser.add_argument("--duels", type=int, help="run N batched 1v1 duels of the battlefield configs instead")
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.duels:
+        from battlefield import CONFIG_1, CONFIG_2
+        result = run_duels(CONFIG_1, CONFIG_2, args.duels, args.turns, args.seed)
+        elapsed = time.perf_counter() - start
+        print(f"{result.battles} duels in {elapsed:.3f}s: P(a)={result.win_probability_a:.3f} "
+              f"P(b)={result.win_probability_b:.3f} draws={result.draws} mean turns {result.mean_turns:.1f}")
+    else:
+        result = run_royale(ArrayRoster.repeat(args.size), args.turns, args.seed)
+        elapsed = time.perf_counter() - start
+        print(f"{args.size} combatants, {result.turns} turns in {elapsed:.3f}s: "
+              f"{result.survivors} survivors, winner {result.winner}")
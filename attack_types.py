@@ -1,8 +1,10 @@
 import random
 import math
+from collections import namedtuple
+from functools import lru_cache
 
-def variable_damage(base_damage, variance=0.1):
-    variation = random.gauss(0, base_damage * variance)
+def variable_damage(base_damage, variance=0.1, rng=random):
+    variation = rng.gauss(0, base_damage * variance)
     return max(0, base_damage + variation)
 
 def fatigue_multiplier(entity):
@@ -10,7 +12,31 @@ def fatigue_multiplier(entity):
     return 0.5 + 0.5 * ratio
 
 
+# Attack catalogue. Every attack pays its costs, then
+#   hit chance = (accuracy * [fatigue] - target evasion) * hit_scale
+#   damage     = variable_damage(stat * power, variance) * [fatigue]
+# where the bracketed fatigue factors only apply when fatigue_accuracy /
+# fatigue_damage are set, and variance 0 means no damage roll. A hit
+# costs karma_hit karma, a miss karma_miss. New attacks are new rows: the
+# scalar kernel (Attack.apply) and the vectorised one (attack_kernel)
+# both read the catalogue.
+AttackSpec = namedtuple(
+    "AttackSpec",
+    "name stamina_cost mana_cost hit_scale fatigue_accuracy stat power variance fatigue_damage karma_hit karma_miss",
+)
+
+CATALOGUE = {
+    "normal_attack": AttackSpec("Normal Attack", 10, 0, 1.0, False, "attack", 1.0, 0.2, False, 5, 2),
+    "heavy_attack": AttackSpec("Heavy Attack", 20, 0, 1.0, True, "attack", 1.5, 0.25, True, 7, 3),
+    "quick_attack": AttackSpec("Quick Attack", 5, 0, 1.1, False, "attack", 0.75, 0.0, False, 3, 1),
+    "magic_attack": AttackSpec("Magic Attack", 0, 25, 1.0, False, "special_attack_damage", 1.0, 0.0, False, 5, 4),
+}
+
+
 class BaseAttack:
+    # Attacks hold no per-battle state; use the shared instances in ATTACKS.
+    __slots__ = ("name", "stamina_cost", "mana_cost", "karma_cost")
+
     def __init__(self, name, stamina_cost=0, mana_cost=0, karma_cost=0):
         self.name = name
         self.stamina_cost = stamina_cost
@@ -19,10 +45,10 @@ class BaseAttack:
 
     def check_resources(self, attacker):
         if attacker.stamina < self.stamina_cost:
-            attacker.log(f"{attacker.name} lacks stamina for {self.name}!")
+            attacker.log("lacks_stamina", None, None, self.name)
             return False
         if attacker.mana < self.mana_cost:
-            attacker.log(f"{attacker.name} lacks mana for {self.name}!")
+            attacker.log("lacks_mana", None, None, self.name)
             return False
         return True
 
@@ -30,81 +56,94 @@ class BaseAttack:
         raise NotImplementedError("Subclasses must implement apply().")
 
 
-class NormalAttack(BaseAttack):
-    def __init__(self):
-        super().__init__("Normal Attack", stamina_cost=10, karma_cost=5)
-
-    def apply(self, attacker, defender):
-        if not self.check_resources(attacker):
-            return False
-        attacker.stamina -= self.stamina_cost
-        hit_chance = attacker.accuracy - defender.evasion
-        if random.random() > hit_chance:
-            attacker.karma -= 2
-            attacker.log(f"{attacker.name}'s normal attack missed {defender.name}!")
-            return False
-        damage = variable_damage(attacker.attack, variance=0.2)
-        actual = defender.take_damage(damage)
-        attacker.karma -= self.karma_cost
-        attacker.log(f"{attacker.name} used {self.name} for {actual:.1f} actual damage.")
-        return True
-
+class Attack(BaseAttack):
+    """An attack compiled from one catalogue row (AttackSpec)."""
+    __slots__ = ("hit_scale", "fatigue_accuracy", "stat", "power", "variance", "fatigue_damage", "karma_miss")
 
-class HeavyAttack(BaseAttack):
-    def __init__(self):
-        super().__init__("Heavy Attack", stamina_cost=20, karma_cost=7)
+    def __init__(self, spec):
+        super().__init__(spec.name, stamina_cost=spec.stamina_cost, mana_cost=spec.mana_cost, karma_cost=spec.karma_hit)
+        self.hit_scale = spec.hit_scale
+        self.fatigue_accuracy = spec.fatigue_accuracy
+        self.stat = spec.stat
+        self.power = spec.power
+        self.variance = spec.variance
+        self.fatigue_damage = spec.fatigue_damage
+        self.karma_miss = spec.karma_miss
 
     def apply(self, attacker, defender):
         if not self.check_resources(attacker):
             return False
-        attacker.stamina -= self.stamina_cost
-        effective_accuracy = (attacker.accuracy * fatigue_multiplier(attacker)) - defender.evasion
-        if random.random() > effective_accuracy:
-            attacker.karma -= 3
-            attacker.log(f"{attacker.name}'s heavy attack missed {defender.name}!")
+        if self.stamina_cost:
+            attacker.stamina -= self.stamina_cost
+        if self.mana_cost:
+            attacker.mana -= self.mana_cost
+        accuracy = attacker.accuracy
+        if self.fatigue_accuracy:
+            accuracy = accuracy * fatigue_multiplier(attacker)
+        hit_chance = (accuracy - defender.evasion) * self.hit_scale
+        if attacker.rng.random() > hit_chance:
+            attacker.karma -= self.karma_miss
+            attacker.log("attack_missed", defender.name, None, self.name)
             return False
-        damage = variable_damage(attacker.attack * 1.5, variance=0.25) * fatigue_multiplier(attacker)
+        damage = getattr(attacker, self.stat) * self.power
+        if self.variance:
+            damage = variable_damage(damage, variance=self.variance, rng=attacker.rng)
+        if self.fatigue_damage:
+            damage = damage * fatigue_multiplier(attacker)
         actual = defender.take_damage(damage)
         attacker.karma -= self.karma_cost
-        attacker.log(f"{attacker.name} used {self.name} for {actual:.1f} actual damage.")
+        attacker.log("attack_hit", defender.name, actual, self.name)
         return True
 
 
-class QuickAttack(BaseAttack):
-    def __init__(self):
-        super().__init__("Quick Attack", stamina_cost=5, karma_cost=3)
-
-    def apply(self, attacker, defender):
-        if not self.check_resources(attacker):
-            return False
-        attacker.stamina -= self.stamina_cost
-        hit_chance = (attacker.accuracy - defender.evasion) * 1.1
-        if random.random() > hit_chance:
-            attacker.karma -= 1
-            attacker.log(f"{attacker.name}'s quick attack missed {defender.name}!")
-            return False
-        damage = attacker.attack * 0.75
-        actual = defender.take_damage(damage)
-        attacker.karma -= self.karma_cost
-        attacker.log(f"{attacker.name} used {self.name} for {actual:.1f} actual damage.")
-        return True
-
-
-class MagicAttack(BaseAttack):
-    def __init__(self):
-        super().__init__("Magic Attack", mana_cost=25, karma_cost=5)
-
-    def apply(self, attacker, defender):
-        if not self.check_resources(attacker):
-            return False
-        attacker.mana -= self.mana_cost
-        hit_chance = attacker.accuracy - defender.evasion
-        if random.random() > hit_chance:
-            attacker.karma -= 4
-            attacker.log(f"{attacker.name}'s magic attack missed {defender.name}!")
-            return False
-        damage = attacker.special_attack_damage
-        actual = defender.take_damage(damage)
-        attacker.karma -= self.karma_cost
-        attacker.log(f"{attacker.name} used {self.name} for {actual:.1f} actual damage.")
-        return True
+ATTACKS = {key: Attack(spec) for key, spec in CATALOGUE.items()}
+
+
+@lru_cache(maxsize=None)
+def attack_table(actions):
+    """The catalogue as NumPy columns indexed by action code.
+
+    `actions` is a tuple of action names in code order; codes that are not
+    attacks get an all-zero row and is_attack False.
+    """
+    import numpy as np
+    rows = [CATALOGUE.get(action) for action in actions]
+
+    def column(field, dtype=np.float64):
+        return np.array([getattr(spec, field) if spec else 0 for spec in rows], dtype=dtype)
+
+    return {
+        "is_attack": np.array([spec is not None for spec in rows]),
+        "stamina_cost": column("stamina_cost"),
+        "mana_cost": column("mana_cost"),
+        "hit_scale": column("hit_scale"),
+        "fatigue_accuracy": column("fatigue_accuracy", bool),
+        "special": np.array([bool(spec) and spec.stat == "special_attack_damage" for spec in rows]),
+        "power": column("power"),
+        "variance": column("variance"),
+        "fatigue_damage": column("fatigue_damage", bool),
+        "karma_hit": column("karma_hit"),
+        "karma_miss": column("karma_miss"),
+    }
+
+
+def attack_kernel(table, action, stamina, max_stamina, attack, special_attack_damage, accuracy, evasion, rng):
+    """Vectorised Attack.apply after costs are paid, for a population at once.
+
+    Returns (hit, karma lost, damage before the target's defense). Rows whose
+    action is not an attack never hit and lose no karma.
+    """
+    import numpy as np
+    count = action.size
+    attacking = table["is_attack"][action]
+    fatigue = 0.5 + 0.5 * stamina / max_stamina
+    accuracy = np.where(table["fatigue_accuracy"][action], accuracy * fatigue, accuracy)
+    hit_chance = (accuracy - evasion) * table["hit_scale"][action]
+    hit = attacking & (rng.random(count) <= hit_chance)
+    karma = np.where(hit, table["karma_hit"][action], table["karma_miss"][action] * attacking)
+
+    base = np.where(table["special"][action], special_attack_damage, attack) * table["power"][action]
+    noise = rng.standard_normal(count)
+    damage = np.maximum(0, base + noise * base * table["variance"][action])
+    damage = np.where(table["fatigue_damage"][action], damage * fatigue, damage)
+    return hit, karma, damage
@@ -0,0 +1,111 @@
+# awareness_async.py
+# asyncio front end for JarvisAwareness, for use inside a service loop.
+#
+# Nothing here runs on the event loop itself:
+#   - state calls (events, self.json, memory, reflection, context) go to one
+#     dedicated worker thread, so they keep their order and never touch
+#     JarvisAwareness state from two threads at once;
+#   - the model calls of conversation summaries run in the default
+#     executor, up to `concurrency` at a time, since they spend their time
+#     waiting on the model (each also fans its chunks out to
+#     `summary_workers` threads); only the summary cache, behind
+#     MemoryStore's lock, is touched from there. Storing the summary goes
+#     back through the awareness thread.
+#
+# Build it with `await AsyncJarvisAwareness.create(...)` so that setting up
+# JarvisAwareness (directories, counter backfill, SQLite migration) also
+# happens off the loop.
+#
+# Usage:
+#   async with await AsyncJarvisAwareness.create(concurrency=2) as j:
+#       await j.log_event("battle_end", {"winner": "Entity2"})
+#       print(await j.reflect())
+#       summaries = await j.summarize_many(Path(".jarvis/conversations").glob("*.json"))
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from Awareness import JarvisAwareness
+
+
+class AsyncJarvisAwareness:
+    def __init__(self, base_dir: Path | None = None, concurrency: int = 2, **options):
+        """Builds JarvisAwareness on the calling thread; from a running loop use create()."""
+        self._setup(concurrency)
+        self.sync = JarvisAwareness(base_dir, **options)
+
+    @classmethod
+    async def create(cls, base_dir: Path | None = None, concurrency: int = 2, **options):
+        """Build one without blocking the loop: JarvisAwareness is set up on the awareness thread."""
+        self = cls.__new__(cls)
+        self._setup(concurrency)
+        self.sync = await self._call(JarvisAwareness, base_dir, **options)
+        return self
+
+    def _setup(self, concurrency):
+        self._state = ThreadPoolExecutor(max_workers=1, thread_name_prefix="awareness")
+        self.concurrency = concurrency
+        self._semaphore = None
+
+    async def _call(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._state, lambda: fn(*args, **kwargs))
+
+    # State, serialised on the awareness thread
+    async def log_event(self, event_type: str, details: dict | None = None, level="INFO"):
+        return await self._call(self.sync.log_event, event_type, details, level)
+
+    async def reflect(self, lookback_hours: int = 12) -> str:
+        return await self._call(self.sync.reflect, lookback_hours)
+
+    async def events_since(self, lookback_hours: float = 12, limit: int | None = None) -> list[dict]:
+        return await self._call(self.sync.events_since, lookback_hours, limit)
+
+    async def recent_events(self, n: int = 50) -> list[dict]:
+        return await self._call(self.sync.recent_events, n)
+
+    async def get_self(self) -> dict:
+        return await self._call(lambda: dict(self.sync.get_self()))
+
+    async def update_self(self, updates: dict) -> dict:
+        return await self._call(lambda: dict(self.sync.update_self(updates)))
+
+    async def remember(self, key: str, value: str):
+        return await self._call(self.sync.remember, key, value)
+
+    async def recall(self, key: str):
+        return await self._call(self.sync.recall, key)
+
+    async def all_memories(self) -> dict:
+        return await self._call(self.sync.all_memories)
+
+    async def compose_context(self) -> dict:
+        return await self._call(self.sync.compose_context)
+
+    async def flush(self):
+        return await self._call(self.sync.flush)
+
+    # Model calls, concurrent up to `concurrency`
+    async def summarize_conversation(self, convo_path: Path, model="qwen2.5:7b-instruct") -> str:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            convo, result = await asyncio.to_thread(self.sync._summarize, Path(convo_path), model)
+        return await self._call(self.sync._store_summary, convo, result)
+
+    async def summarize_many(self, convo_paths, model="qwen2.5:7b-instruct", return_exceptions=False) -> list:
+        """Summarise several conversation files concurrently; results follow the input order."""
+        return await asyncio.gather(
+            *(self.summarize_conversation(path, model) for path in convo_paths),
+            return_exceptions=return_exceptions,
+        )
+
+    async def close(self):
+        await self._call(self.sync.close)
+        self._state.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
@@ -0,0 +1,52 @@
+# awareness_backend.py
+# Model backends for JarvisAwareness.
+#
+# A backend only needs chat(model=..., messages=[...]) returning an
+# ollama-style {"message": {"content": ...}} dict. The ollama package is
+# imported the first time a backend actually talks to the model, so
+# processes that only log events or reflect never load it (and work
+# without it installed).
+#
+# Usage:
+#   JarvisAwareness()                          # ollama on the default host
+#   JarvisAwareness(backend="ollama")
+#   JarvisAwareness(backend=OllamaBackend(host="http://gpu-box:11434"))
+#   JarvisAwareness(backend=lambda model, messages: {"message": {"content": "stub"}})
+
+
+class ChatBackend:
+    def chat(self, model: str, messages: list[dict]) -> dict:
+        raise NotImplementedError
+
+    def __call__(self, model: str, messages: list[dict]) -> dict:
+        return self.chat(model=model, messages=messages)
+
+
+class OllamaBackend(ChatBackend):
+    def __init__(self, host: str | None = None):
+        self.host = host
+        self._client = None
+
+    def chat(self, model, messages):
+        if self._client is None:
+            import ollama
+            self._client = ollama.Client(host=self.host) if self.host else ollama
+        return self._client.chat(model=model, messages=messages)
+
+
+BACKENDS = {
+    "ollama": OllamaBackend,
+}
+
+
+def resolve_backend(backend=None):
+    """Turn a backend name, ChatBackend or plain chat callable into a chat callable."""
+    if backend is None:
+        backend = "ollama"
+    if isinstance(backend, str):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown model backend {backend!r}, expected one of {sorted(BACKENDS)}")
+        return BACKENDS[backend]()
+    if not callable(backend):
+        raise TypeError(f"Model backend must be a name, a ChatBackend or a chat callable, not {type(backend).__name__}")
+    return backend
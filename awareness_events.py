@@ -0,0 +1,489 @@
+# awareness_events.py
+# Fast access to Jarvis' events.jsonl without re-reading it.
+#
+# EventIndex keeps a sidecar file (events.jsonl.idx) holding the byte
+# offset it has indexed up to, followed by one fixed-size
+# (timestamp, byte offset) entry per event. sync() only parses the bytes
+# appended since the last call, and time-window lookups are a binary
+# search over the memory-mapped index, so reflection cost does not grow
+# with the size of the log.
+#
+# EventCounters keeps per-minute counts of each event type, updated as
+# events are logged, so summarising any lookback window only touches the
+# buckets inside it. The counts are saved with the number of bytes of
+# events.jsonl they cover; on load, whatever was appended past that is
+# counted again, so a file saved before a crash is never trusted blindly.
+#
+# EventWriter keeps events.jsonl open and buffers lines, flushing when the
+# buffer fills or, from a background thread, once flush_interval has
+# passed. Once the active file reaches max_bytes it is rotated to
+# events.<stamp>.jsonl, where <stamp> is the rotation time, so a reader can
+# skip segments that end before its lookback window without opening them.
+# With compression, the same background thread gzip/zstd compresses
+# rotated segments, so writers never wait on it. Given EventCounters, the
+# writer counts each event as it is buffered and saves the counts, when
+# they changed, at most once per flush_interval, right after a flush.
+
+import gzip
+import json
+import mmap
+import os
+import shutil
+import struct
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+HEADER = struct.Struct("<Q")     # bytes of events.jsonl covered by the index
+ENTRY = struct.Struct("<qQ")     # event timestamp (epoch seconds), byte offset of its line
+TAIL_BLOCK = 64 * 1024
+STAMP = "%Y%m%dT%H%M%S"
+COMPRESSED_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def parse_ts(line: bytes) -> int:
+    """Epoch seconds of an events.jsonl line (log_event writes "ts" first)."""
+    if line.startswith(b'{"ts": "'):
+        end = line.find(b'"', 8)
+        stamp = line[8:end].decode("ascii")
+    else:
+        stamp = json.loads(line).get("ts", "")
+    return int(datetime.fromisoformat(stamp).timestamp())
+
+
+def parse_records(lines) -> list[dict]:
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except Exception:
+            continue
+    return records
+
+
+def segments(events_path: Path) -> list[tuple[datetime, Path]]:
+    """Rotated segments of an event log as (rotated at, path), oldest first."""
+    events_path = Path(events_path)
+    found = {}
+    for path in events_path.parent.glob(f"{events_path.stem}.*{events_path.suffix}*"):
+        if path.suffix == ".tmp":
+            continue  # compression in progress
+        stamp, _, n = path.name[len(events_path.stem) + 1:].split(".", 1)[0].partition("-")
+        try:
+            key = (datetime.strptime(stamp, STAMP), int(n or 0))
+        except ValueError:
+            continue
+        # Mid-compression both copies exist; the plain one is complete
+        if key not in found or len(path.name) < len(found[key].name):
+            found[key] = path
+    return [(key[0], found[key]) for key in sorted(found)]
+
+
+def read_segment(path: Path) -> list[bytes]:
+    if not path.exists():
+        # Compressed since it was listed
+        for suffix in COMPRESSED_SUFFIXES.values():
+            if path.with_name(path.name + suffix).exists():
+                return read_segment(path.with_name(path.name + suffix))
+        return []
+    if path.suffix == ".gz":
+        with gzip.open(path, "rb") as f:
+            return f.read().splitlines()
+    if path.suffix == ".zst":
+        import zstandard
+        with open(path, "rb") as raw, zstandard.ZstdDecompressor().stream_reader(raw) as f:
+            return f.read().splitlines()
+    return path.read_bytes().splitlines()
+
+
+def compress_segment(path: Path, compression: str) -> Path:
+    target = path.with_name(path.name + COMPRESSED_SUFFIXES[compression])
+    tmp = target.with_name(target.name + ".tmp")
+    with open(path, "rb") as src:
+        if compression == "gzip":
+            with gzip.open(tmp, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+        else:
+            import zstandard
+            with open(tmp, "wb") as raw, zstandard.ZstdCompressor().stream_writer(raw) as dst:
+                shutil.copyfileobj(src, dst)
+    tmp.replace(target)
+    path.unlink()
+    return target
+
+
+def tail_lines(path: Path, n: int) -> list[bytes]:
+    """Last `n` complete lines of a file, reading backwards from EOF in blocks."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        data = b""
+        while pos > 0 and data.count(b"\n") <= n:
+            step = min(TAIL_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    return [line for line in data.splitlines() if line][-n:] if n > 0 else []
+
+
+class EventIndex:
+    """Persisted, incrementally maintained timestamp index over an events.jsonl file."""
+
+    def __init__(self, events_path: Path, index_path: Path | None = None):
+        self.events_path = Path(events_path)
+        self.index_path = Path(index_path or self.events_path.with_name(self.events_path.name + ".idx"))
+
+    def _covered(self) -> int:
+        if not self.index_path.exists() or self.index_path.stat().st_size < HEADER.size:
+            return 0
+        with open(self.index_path, "rb") as f:
+            return HEADER.unpack(f.read(HEADER.size))[0]
+
+    def reset(self):
+        """Forget everything indexed so far (the active file was rotated away)."""
+        with open(self.index_path, "wb") as f:
+            f.write(HEADER.pack(0))
+
+    def sync(self) -> int:
+        """Index events appended since the last sync. Returns the number of new entries."""
+        if not self.events_path.exists():
+            return 0
+        size = self.events_path.stat().st_size
+        covered = self._covered()
+        if covered > size or not self.index_path.exists():
+            # The log was truncated or replaced; start over
+            self.reset()
+            covered = 0
+        if covered == size:
+            return 0
+
+        entries = []
+        with open(self.events_path, "rb") as f:
+            f.seek(covered)
+            offset = covered
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partial line still being written
+                try:
+                    entries.append(ENTRY.pack(parse_ts(line), offset))
+                except Exception:
+                    pass
+                offset += len(line)
+
+        with open(self.index_path, "r+b") as f:
+            f.seek(0, os.SEEK_END)
+            f.write(b"".join(entries))
+            f.seek(0)
+            f.write(HEADER.pack(offset))
+        return len(entries)
+
+    def __len__(self):
+        if not self.index_path.exists():
+            return 0
+        return (self.index_path.stat().st_size - HEADER.size) // ENTRY.size
+
+    def _entry(self, view, i):
+        return ENTRY.unpack_from(view, HEADER.size + i * ENTRY.size)
+
+    def _bisect(self, view, count, ts) -> int:
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._entry(view, mid)[0] < ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _active_since(self, cutoff, limit):
+        # Returns (records, whether older segments may still hold matches)
+        self.sync()
+        count = len(self)
+        if count == 0:
+            return [], True
+        with open(self.index_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            start = self._bisect(view, count, int(cutoff.timestamp())) if cutoff else 0
+            if limit is not None:
+                start = max(start, count - limit)
+            if start >= count:
+                return [], False
+            begin = self._entry(view, start)[1]
+            (end,) = HEADER.unpack_from(view, 0)
+        with open(self.events_path, "rb") as f:
+            f.seek(begin)
+            data = f.read(end - begin)
+        return parse_records(data.splitlines()), start == 0
+
+    def _read_back(self, path, wanted):
+        # Plain segments only need their last `wanted` lines when a limit applies
+        if wanted is not None and path.suffix not in COMPRESSED_SUFFIXES.values():
+            try:
+                return tail_lines(path, wanted)
+            except FileNotFoundError:
+                pass  # compressed since it was listed
+        return read_segment(path)
+
+    def records_since(self, cutoff: datetime | None = None, limit: int | None = None) -> list[dict]:
+        """Events at or after `cutoff`, at most the last `limit` of them.
+
+        Reads back into rotated segments only while the window or the limit
+        reaches past the start of the active file; with a limit, only the
+        tail of an uncompressed segment is read.
+        """
+        records, reaches_back = self._active_since(cutoff, limit)
+        if not reaches_back:
+            return records
+        chunks = [records]
+        wanted = None if limit is None else limit - len(records)
+        for rotated_at, path in reversed(segments(self.events_path)):
+            if wanted == 0 or (cutoff and rotated_at < cutoff.replace(microsecond=0)):
+                break
+            older = parse_records(self._read_back(path, wanted))
+            if cutoff:
+                stamp = cutoff.isoformat(timespec="seconds")
+                older = [r for r in older if r.get("ts", "") >= stamp]
+            if wanted is not None:
+                older = older[-wanted:] if wanted else []
+                wanted -= len(older)
+            chunks.append(older)
+        return [record for chunk in reversed(chunks) for record in chunk]
+
+
+class EventWriter:
+    """Buffered, rotating appender for events.jsonl."""
+
+    def __init__(self, path: Path, buffer_bytes=64 * 1024, flush_interval=1.0,
+                 max_bytes=64 * 1024 * 1024, compression=None, on_rotate=None, counters=None):
+        if compression not in (None, *COMPRESSED_SUFFIXES):
+            raise ValueError(f"Unknown compression {compression!r}, expected one of {sorted(COMPRESSED_SUFFIXES)}")
+        self.path = Path(path)
+        self.buffer_bytes = buffer_bytes
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self.on_rotate = on_rotate
+        self.counters = counters
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._buffer = []
+        self._buffered = 0
+        self._last_flush = self._counts_saved = time.monotonic()
+        self._file = None
+        self._size = self.path.stat().st_size if self.path.exists() else 0
+        self._to_compress = []
+        self._closed = False
+        self._thread = threading.Thread(target=self._background, name="EventWriter", daemon=True)
+        self._thread.start()
+
+    def write(self, entry: dict):
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            if self.counters is not None:
+                self.counters.add_record(entry)
+            self._buffer.append(line)
+            self._buffered += len(line)
+            if self._buffered >= self.buffer_bytes or time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+            elif len(self._buffer) == 1:
+                self._wake.notify()  # start the flush timer
+
+    def _background(self):
+        # Flushes buffers older than flush_interval and compresses rotated segments
+        while True:
+            with self._lock:
+                if not self._to_compress and not self._closed:
+                    self._wake.wait(self.flush_interval if self._pending() else None)
+                if self._pending() and time.monotonic() - self._last_flush >= self.flush_interval:
+                    self._flush()
+                pending, self._to_compress = self._to_compress, []
+                closed = self._closed
+            for segment in pending:
+                try:
+                    compress_segment(segment, self.compression)
+                except OSError:
+                    pass  # leave it uncompressed; readers handle both
+            if closed and not pending:
+                return
+
+    def _pending(self):
+        return self._buffer or (self.counters is not None and self.counters.dirty)
+
+    def _flush(self, save_counts=False):
+        self._last_flush = time.monotonic()
+        if self._buffer:
+            if self._file is None:
+                self._file = open(self.path, "ab")
+            self._file.write(b"".join(self._buffer))
+            self._file.flush()
+            self._size += self._buffered
+            self._buffer.clear()
+            self._buffered = 0
+            if self.max_bytes and self._size >= self.max_bytes:
+                self._rotate()
+        # The buffer is empty, so the counts cover exactly the file as written
+        if self.counters is not None and self.counters.dirty and (
+                save_counts or self._last_flush - self._counts_saved >= self.flush_interval):
+            self.counters.save(self._size)
+            self._counts_saved = self._last_flush
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        stamp = datetime.now().strftime(STAMP)
+        target = self.path.with_name(f"{self.path.stem}.{stamp}{self.path.suffix}")
+        n = 1
+        while any(target.parent.glob(target.name + "*")):
+            target = self.path.with_name(f"{self.path.stem}.{stamp}-{n}{self.path.suffix}")
+            n += 1
+        self.path.replace(target)
+        self._size = 0
+        if self.on_rotate:
+            self.on_rotate()
+        if self.compression:
+            self._to_compress.append(target)
+            self._wake.notify()
+
+    def flush(self, counts=False):
+        """Write buffered events; with counts=True also save the counters now rather than when due."""
+        with self._lock:
+            self._flush(save_counts=counts)
+
+    def rotate(self):
+        """Flush and start a new active file now, regardless of size."""
+        with self._lock:
+            self._flush()
+            if self._size:
+                if self._file is None:
+                    self._file = open(self.path, "ab")
+                self._rotate()
+
+    def close(self):
+        """Flush, close the file and wait for pending compression."""
+        with self._lock:
+            self._flush(save_counts=True)
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._closed = True
+            self._wake.notify()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class EventCounters:
+    """Rolling per-bucket event-type counts, persisted as JSON."""
+
+    def __init__(self, path: Path, bucket_seconds=60, retention_hours=24 * 7):
+        self.path = Path(path)
+        self.bucket_seconds = bucket_seconds
+        self.retention_buckets = retention_hours * 3600 // bucket_seconds
+        self.buckets: dict[int, dict[str, int]] = {}
+        self.covered = 0  # bytes of the active events.jsonl counted
+        self.dirty = False
+
+    def load(self, events_path: Path) -> bool:
+        """Load persisted counts and count events appended since they were saved.
+
+        Returns False if there were none to load or they do not match the
+        log (it was rotated or replaced since), so the caller backfills.
+        """
+        if not self.path.exists():
+            return False
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception:
+            return False
+        events_path = Path(events_path)
+        size = events_path.stat().st_size if events_path.exists() else 0
+        covered = data.get("covered")
+        if data.get("bucket_seconds") != self.bucket_seconds or covered is None or covered > size:
+            return False
+        self.buckets = {int(bucket): counts for bucket, counts in data.get("buckets", {}).items()}
+        self._sort()
+        self.covered = covered
+        if covered < size:
+            self._count_active(events_path)
+        return True
+
+    def _sort(self):
+        # since() and _prune() rely on buckets being kept in time order
+        self.buckets = dict(sorted(self.buckets.items()))
+
+    def save(self, covered: int | None = None):
+        """Write the counts, recording that they cover `covered` bytes of the active log."""
+        if covered is not None:
+            self.covered = covered
+        data = {"bucket_seconds": self.bucket_seconds, "covered": self.covered, "buckets": self.buckets}
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self.path)
+        self.dirty = False
+
+    def add(self, event_type: str, epoch: float, count: int = 1):
+        bucket = int(epoch // self.bucket_seconds)
+        counts = self.buckets.get(bucket)
+        if counts is None:
+            newest = next(reversed(self.buckets), bucket)
+            counts = self.buckets[bucket] = {}
+            if bucket < newest:
+                self._sort()  # the clock stepped back (or a late event)
+            self._prune(max(bucket, newest))
+        counts[event_type] = counts.get(event_type, 0) + count
+        self.dirty = True
+
+    def add_record(self, record: dict):
+        try:
+            epoch = datetime.fromisoformat(record["ts"]).timestamp()
+        except Exception:
+            return
+        self.add(record.get("event", "unknown"), epoch)
+
+    def _prune(self, newest):
+        oldest = newest - self.retention_buckets
+        while self.buckets:
+            first = next(iter(self.buckets))
+            if first >= oldest:
+                break
+            del self.buckets[first]
+
+    def since(self, cutoff: datetime) -> dict[str, int]:
+        """Event-type counts from the bucket containing `cutoff` onwards."""
+        first = int(cutoff.timestamp() // self.bucket_seconds)
+        totals = {}
+        # Buckets are kept in time order, so walk back from the newest
+        for bucket in reversed(self.buckets):
+            if bucket < first:
+                break
+            for event_type, count in self.buckets[bucket].items():
+                totals[event_type] = totals.get(event_type, 0) + count
+        return totals
+
+    def _count_active(self, events_path: Path):
+        # Count the complete lines of the active log past `covered`
+        with open(events_path, "rb") as f:
+            f.seek(self.covered)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partial line still being written
+                self.covered += len(line)
+                for record in parse_records([line]):
+                    self.add_record(record)
+        self.dirty = True
+
+    def backfill(self, events_path: Path):
+        """Rebuild counts from the event log and its rotated segments."""
+        self.buckets = {}
+        self.covered = 0
+        for _, path in segments(events_path):
+            for record in parse_records(read_segment(path)):
+                self.add_record(record)
+        if Path(events_path).exists():
+            self._count_active(events_path)
+        self.dirty = True
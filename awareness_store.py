@@ -0,0 +1,142 @@
+# awareness_store.py
+# Jarvis' long-term memory in SQLite (memory.db) instead of memory.json.
+#
+# Plain remember()/recall() values live in a key-value table and
+# conversation summaries in their own append-only table, so storing one
+# value or one summary writes one row rather than re-serialising
+# everything Jarvis has ever remembered. An existing memory.json is
+# migrated on first open and renamed to memory.json.migrated.
+#
+# A third table caches model results of the chunked summariser
+# (awareness_summary.py) by content hash.
+#
+# The connection is shared across threads (the async wrapper runs calls in
+# worker threads), so every statement goes through one lock.
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS memory (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS summaries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT,
+    conversation_id TEXT,
+    title TEXT,
+    summary TEXT
+);
+CREATE TABLE IF NOT EXISTS summary_cache (
+    key TEXT PRIMARY KEY,
+    conversation_id TEXT,
+    text TEXT NOT NULL
+);
+"""
+
+SUMMARY_FIELDS = ("timestamp", "conversation_id", "title", "summary")
+
+
+class MemoryStore:
+    """Key-value memory plus conversation summaries, backed by SQLite."""
+
+    def __init__(self, path: Path, legacy_json: Path | None = None):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(memory)")]
+        if "updated" not in columns:  # memory.db from before values were timestamped
+            self._conn.execute("ALTER TABLE memory ADD COLUMN updated REAL NOT NULL DEFAULT 0")
+        if legacy_json is not None and Path(legacy_json).exists():
+            self.migrate(Path(legacy_json))
+
+    def migrate(self, legacy_json: Path):
+        """Import a memory.json written by older versions, then set it aside."""
+        try:
+            data = json.loads(legacy_json.read_text(encoding="utf-8"))
+        except Exception:
+            data = {}
+        summaries = data.pop("conversation_summaries", [])
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO memory (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value, ensure_ascii=False)) for key, value in data.items()],
+            )
+            self._conn.executemany(
+                "INSERT INTO summaries (timestamp, conversation_id, title, summary) VALUES (?, ?, ?, ?)",
+                [tuple(entry.get(name) for name in SUMMARY_FIELDS) for entry in summaries],
+            )
+        legacy_json.replace(legacy_json.with_name(legacy_json.name + ".migrated"))
+
+    def set(self, key: str, value):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO memory (key, value, updated) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), time.time()),
+            )
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM memory WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def delete(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM memory WHERE key = ?", (key,))
+
+    def items(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value FROM memory ORDER BY key").fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def recent_items(self) -> list[tuple]:
+        """(key, value) pairs, most recently remembered first."""
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value FROM memory ORDER BY updated DESC, key").fetchall()
+        return [(key, json.loads(value)) for key, value in rows]
+
+    def add_summary(self, entry: dict):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO summaries (timestamp, conversation_id, title, summary) VALUES (?, ?, ?, ?)",
+                tuple(entry.get(name) for name in SUMMARY_FIELDS),
+            )
+
+    def summaries(self, limit: int | None = None) -> list[dict]:
+        """Conversation summaries, oldest first; with `limit`, only the latest ones."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT timestamp, conversation_id, title, summary FROM summaries ORDER BY id DESC LIMIT ?",
+                (-1 if limit is None else limit,),
+            ).fetchall()
+        return [dict(zip(SUMMARY_FIELDS, row)) for row in reversed(rows)]
+
+    def cached_summary(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute("SELECT text FROM summary_cache WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def cache_summary(self, key: str, conversation_id: str, text: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summary_cache (key, conversation_id, text) VALUES (?, ?, ?)",
+                (key, conversation_id, text),
+            )
+
+    def as_dict(self) -> dict:
+        """Everything, in the shape memory.json used to have."""
+        data = self.items()
+        data["conversation_summaries"] = self.summaries()
+        return data
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,157 @@
+# awareness_summary.py
+# Chunked map-reduce conversation summaries for JarvisAwareness.
+#
+# A conversation is split into chunks of whole messages (in order, so
+# appending messages only changes the last chunk). Each chunk is
+# summarised on its own, concurrently on a small thread pool, and the
+# partial summaries are then summarised into one paragraph, repeating the
+# reduce step (at most MAX_REDUCE_ROUNDS times, and only while it shrinks
+# the number of parts) if they are still too long for a single prompt.
+#
+# Every model result is cached under a hash of the conversation id, the
+# model and the hashes of the messages (or partial summaries) it was built
+# from, so re-summarising a conversation only calls the model for chunks
+# that changed, and an unchanged conversation costs no model calls at all.
+#
+# `chat` is any callable with the ollama.chat signature
+# (model=..., messages=[...]) returning {"message": {"content": ...}},
+# such as a backend from awareness_backend.py or a local stub.
+
+import hashlib
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+SYSTEM = "You are an AI that writes natural language summaries for memory retention."
+
+FINAL_PROMPT = (
+    "Summarize the following conversation between a user and an AI assistant "
+    "into a clear, plain paragraph of 500–1000 words. "
+    "Avoid bullet points, lists, markdown, or headings. "
+    "Write it as a natural narrative focusing on what was discussed, "
+    "the user's intentions, the assistant's responses, and any facts learned.\n\n"
+)
+CHUNK_PROMPT = (
+    "Summarize this part of a longer conversation between a user and an AI assistant "
+    "into one plain paragraph. Keep every topic, request, answer and fact mentioned; "
+    "avoid bullet points, lists, markdown, or headings.\n\n"
+)
+MERGE_PROMPT = (
+    "The following paragraphs summarize consecutive parts of one conversation between "
+    "a user and an AI assistant. Combine them into a clear, plain paragraph of 500–1000 words "
+    "written as a natural narrative, without bullet points, lists, markdown, or headings.\n\n"
+)
+
+MAX_REDUCE_ROUNDS = 3
+
+Summary = namedtuple("Summary", "text cached model_calls")
+
+
+def digest(*parts: str) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def render_messages(messages: list[dict]) -> list[str]:
+    return [
+        f"{m['role'].capitalize()}: {m['content'].strip()}"
+        for m in messages if m["role"] != "system"
+    ]
+
+
+def chunk_lines(lines: list[str], chunk_chars: int, split_long: bool = True) -> list[list[str]]:
+    """Pack lines greedily, in order, into chunks of at most chunk_chars.
+
+    A single line longer than chunk_chars is split across chunks, or with
+    split_long=False gets a chunk of its own.
+    """
+    chunks, current, size = [], [], 0
+    for line in lines:
+        while split_long and len(line) > chunk_chars:
+            if current:
+                chunks.append(current)
+                current, size = [], 0
+            chunks.append([line[:chunk_chars]])
+            line = line[chunk_chars:]
+        if current and size + len(line) + 1 > chunk_chars:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class ConversationSummarizer:
+    """Map-reduce summariser with a persistent result cache.
+
+    `cache` needs cached_summary(key) and cache_summary(key,
+    conversation_id, text), e.g. a MemoryStore; None disables caching.
+    """
+
+    def __init__(self, chat, model="qwen2.5:7b-instruct", cache=None, chunk_chars=8000, workers=4):
+        self.chat = chat
+        self.model = model
+        self.cache = cache
+        self.chunk_chars = chunk_chars
+        self.workers = workers
+
+    def _ask(self, prompt: str) -> str:
+        response = self.chat(model=self.model, messages=[
+            {"role": "system", "content": SYSTEM},
+            {"role": "user", "content": prompt},
+        ])
+        return response.get("message", {}).get("content", "").replace("\n", " ").strip()
+
+    def _run(self, conversation_id, jobs):
+        """Run (key, prompt) jobs, serving what it can from the cache. Returns results and model calls."""
+        results = [self.cache.cached_summary(key) if self.cache is not None else None for key, _ in jobs]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if len(missing) <= 1 or self.workers <= 1:
+            fresh = [self._ask(jobs[i][1]) for i in missing]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(missing))) as pool:
+                fresh = list(pool.map(self._ask, [jobs[i][1] for i in missing]))
+        for i, text in zip(missing, fresh):
+            results[i] = text
+            if self.cache is not None:
+                self.cache.cache_summary(jobs[i][0], conversation_id, text)
+        return results, len(missing)
+
+    def summarize(self, conversation_id, messages: list[dict]) -> Summary:
+        conversation_id = str(conversation_id)
+        lines = render_messages(messages)
+        chunks = chunk_lines(lines, self.chunk_chars)
+        if len(chunks) <= 1:
+            text = "\n".join(lines)
+            [summary], calls = self._run(conversation_id, [(digest("final", conversation_id, self.model, text), FINAL_PROMPT + text)])
+            return Summary(summary or "(No summary generated.)", calls == 0, calls)
+
+        # Map: one partial summary per chunk of messages
+        jobs = [
+            (digest("chunk", conversation_id, self.model, *(digest(line) for line in chunk)), CHUNK_PROMPT + "\n".join(chunk))
+            for chunk in chunks
+        ]
+        parts, calls = self._run(conversation_id, jobs)
+
+        # Reduce: merge partial summaries until they fit in one prompt. A
+        # summary is never split across groups; when grouping no longer
+        # shrinks the parts (a model answering at length) or the rounds run
+        # out, whatever is left is merged in one prompt.
+        for reduce_round in range(MAX_REDUCE_ROUNDS + 1):
+            groups = chunk_lines(parts, self.chunk_chars, split_long=False)
+            if len(groups) == 1 or len(groups) >= len(parts) or reduce_round == MAX_REDUCE_ROUNDS:
+                [summary], merged = self._run(conversation_id, [
+                    (digest("merge", conversation_id, self.model, *(digest(p) for p in parts)), MERGE_PROMPT + "\n\n".join(parts))
+                ])
+                calls += merged
+                return Summary(summary or "(No summary generated.)", calls == 0, calls)
+            jobs = [
+                (digest("merge", conversation_id, self.model, *(digest(p) for p in group)), MERGE_PROMPT + "\n\n".join(group))
+                for group in groups
+            ]
+            parts, merged = self._run(conversation_id, jobs)
+            calls += merged
@@ -0,0 +1,141 @@
+# battle_state.py
+# Who is still standing in a battle, kept current as combatants fall and rise.
+#
+# Entities report to the BattleState they are enrolled in: take_damage when
+# their health reaches 0, restore_health when a god brings them back. The
+# state keeps the living, and the living of each faction, in pools that
+# add, remove and pick a random member in O(1), so victory checks and
+# target selection never rescan the roster.
+#
+# In a team battle (`teams=True`) combatants only attack other factions and
+# the battle is decided once a single faction is left standing.
+
+
+class Pool:
+    """A set with O(1) add, discard and indexing (swap-remove on discard)."""
+    __slots__ = ("members", "slots")
+
+    def __init__(self):
+        self.members = []
+        self.slots = {}
+
+    def add(self, item):
+        if item not in self.slots:
+            self.slots[item] = len(self.members)
+            self.members.append(item)
+
+    def discard(self, item):
+        slot = self.slots.pop(item, None)
+        if slot is None:
+            return
+        last = self.members.pop()
+        if last is not item:
+            self.members[slot] = last
+            self.slots[last] = slot
+
+    def __contains__(self, item):
+        return item in self.slots
+
+    def __getitem__(self, i):
+        return self.members[i]
+
+    def __len__(self):
+        return len(self.members)
+
+    def __iter__(self):
+        return iter(self.members)
+
+
+class BattleState:
+    def __init__(self, entities, teams=False):
+        self.entities = list(entities)
+        self.teams = teams
+        self.order = {e: i for i, e in enumerate(self.entities)}
+        self.living = Pool()
+        self.factions = {}
+        self.standing = 0  # factions with anyone alive
+        for e in self.entities:
+            self.factions.setdefault(e.faction, Pool())
+        if teams and len(self.factions) < 2:
+            raise ValueError(f"a team battle needs at least two factions, not {sorted(self.factions)}")
+        for e in self.entities:
+            e.state = self
+            if e.is_alive():
+                self.revived(e)
+
+    # Called by the entities
+    def fallen(self, entity):
+        if entity not in self.living:
+            return
+        self.living.discard(entity)
+        pool = self.factions[entity.faction]
+        pool.discard(entity)
+        if not pool:
+            self.standing -= 1
+
+    def revived(self, entity):
+        if entity in self.living:
+            return
+        self.living.add(entity)
+        pool = self.factions[entity.faction]
+        if not pool:
+            self.standing += 1
+        pool.add(entity)
+
+    def alive_count(self):
+        return len(self.living)
+
+    def faction_counts(self):
+        return {faction: len(pool) for faction, pool in self.factions.items()}
+
+    def alive(self):
+        """The living, in roster order."""
+        return sorted(self.living, key=self.order.__getitem__)
+
+    def is_decided(self):
+        if self.teams:
+            return self.standing <= 1
+        return len(self.living) <= 1
+
+    def winner(self):
+        """Name of the last combatant (or, in a team battle, faction) standing, else None."""
+        if self.teams:
+            if self.standing != 1:
+                return None
+            return next(faction for faction, pool in self.factions.items() if pool)
+        return self.living[0].name if len(self.living) == 1 else None
+
+    def is_enemy(self, entity, other):
+        if self.teams:
+            return entity.faction != other.faction
+        return entity is not other
+
+    def pick_other(self, entity, rng):
+        """A random living combatant other than `entity`, or None."""
+        living = self.living
+        n = len(living)
+        if entity not in living:
+            return living[rng.randrange(n)] if n else None
+        if n <= 1:
+            return None
+        # Uniform over the n - 1 others: draw among the first n - 1 slots and
+        # let the last slot stand in for `entity` if it was drawn
+        pick = living[rng.randrange(n - 1)]
+        return living[n - 1] if pick is entity else pick
+
+    def pick_opponent(self, entity, rng):
+        """A random living enemy of `entity` (any other combatant unless teams), or None."""
+        if not self.teams:
+            return self.pick_other(entity, rng)
+        own = self.factions[entity.faction]
+        enemies = len(self.living) - len(own)
+        if enemies <= 0:
+            return None
+        r = rng.randrange(enemies)
+        for pool in self.factions.values():
+            if pool is own:
+                continue
+            if r < len(pool):
+                return pool[r]
+            r -= len(pool)
+        return None
@@ -0,0 +1,142 @@
+# battle_thread.py
+# Runs a battlefield.Battle on a worker thread for live viewers.
+#
+# The thread steps the battle at a set number of turns per second (or as
+# fast as it can) and publishes immutable snapshots of it. The snapshot
+# queue holds only the latest one, so a viewer polling at its own frame
+# rate always renders the current state and never falls behind the
+# simulation. Combat log lines go wherever the battle's CombatLog sends
+# them; point it at a queue.Queue to hand them to another thread.
+#
+# Usage:
+#   log_lines = queue.Queue()
+#   log = CombatLog(log_lines.put)
+#   gods = get_all_gods(logger=log)
+#   runner = BattleThread(Battle(classic_roster(gods, log), gods, log=log), turns_per_second=None)
+#   runner.start(); runner.resume()
+#   snapshot = runner.latest()
+
+import queue
+import threading
+import time
+from collections import namedtuple
+
+EntitySnapshot = namedtuple(
+    "EntitySnapshot",
+    "name kind faction health max_health mana max_mana stamina max_stamina karma alive",
+)
+BattleSnapshot = namedtuple("BattleSnapshot", "turn max_turns entities cosmic_event over winner survivors")
+
+
+def snapshot(battle):
+    entities = tuple(
+        EntitySnapshot(e.name, type(e).__name__, e.faction, e.health, e.max_health, e.mana, e.max_mana,
+                       e.stamina, e.max_stamina, e.karma, e.is_alive())
+        for e in battle.entities
+    )
+    state = battle.state
+    over = battle.is_over()
+    winner = state.winner() if over else None
+    event = battle.cosmic_event.name if battle.cosmic_event else None
+    return BattleSnapshot(battle.turn, battle.max_turns, entities, event, over, winner, state.alive_count())
+
+
+class BattleThread(threading.Thread):
+    """Steps a Battle in the background; starts paused.
+
+    `turns_per_second` of None runs flat out. Snapshots are published at
+    most `publish_interval` seconds apart while running, and always after
+    a single step and at the end of the battle.
+    """
+
+    def __init__(self, battle, turns_per_second=1.0, publish_interval=1 / 120):
+        super().__init__(name="BattleThread", daemon=True)
+        self.battle = battle
+        self.turns_per_second = turns_per_second
+        self.publish_interval = publish_interval
+        self.snapshots = queue.Queue(maxsize=1)
+        self._cond = threading.Condition()
+        self._running = False
+        self._stopped = False
+        self._steps = 0
+        self._next_due = 0.0
+        self._published = 0.0
+
+    # Controls, callable from any thread
+    def resume(self):
+        with self._cond:
+            self._running = True
+            self._next_due = time.monotonic()
+            self._cond.notify()
+
+    def pause(self):
+        with self._cond:
+            self._running = False
+
+    @property
+    def running(self):
+        return self._running
+
+    def step_once(self):
+        with self._cond:
+            self._steps += 1
+            self._cond.notify()
+
+    def set_speed(self, turns_per_second):
+        with self._cond:
+            self.turns_per_second = turns_per_second
+            self._next_due = time.monotonic()
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def latest(self):
+        """The newest snapshot published since the last call, or None."""
+        try:
+            return self.snapshots.get_nowait()
+        except queue.Empty:
+            return None
+
+    def publish(self):
+        self._published = time.monotonic()
+        state = snapshot(self.battle)
+        try:
+            self.snapshots.get_nowait()
+        except queue.Empty:
+            pass
+        self.snapshots.put_nowait(state)
+
+    def _wait_time(self):
+        # None: wait for a control call; 0: step now; >0: seconds until the next paced turn
+        if self._stopped or self._steps:
+            return 0
+        if not self._running:
+            return None
+        if not self.turns_per_second:
+            return 0
+        return max(0.0, self._next_due - time.monotonic())
+
+    def run(self):
+        battle = self.battle
+        self.publish()
+        while not battle.is_over():
+            with self._cond:
+                wait = self._wait_time()
+                while wait != 0:
+                    self._cond.wait(wait)
+                    wait = self._wait_time()
+                if self._stopped:
+                    return
+                single = self._steps > 0
+                if single:
+                    self._steps -= 1
+                elif self.turns_per_second:
+                    interval = 1 / self.turns_per_second
+                    self._next_due = max(self._next_due + interval, time.monotonic() - interval)
+            battle.step()
+            if single or time.monotonic() - self._published >= self.publish_interval:
+                self.publish()
+        self.publish()
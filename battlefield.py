@@ -1,5 +1,8 @@
 # battlefield.py
-import time, random
+import argparse
+import random
+import time
+from dataclasses import dataclass, field
 from entity import Entity
 from priest import Priest
 from mechanist import Mechanist
@@ -7,6 +10,22 @@ from intern import Intern
 from gods import get_all_gods
 from gods import Brahma, Vishnu, Shiva
 from cosmic_event import CosmicEvent
+from combat_log import CombatLog
+from rng import derive_seed, stream
+from replay import ReplayRecorder
+from battle_state import BattleState
+from spatial import SpatialGrid
+
+CONFIG_1 = {
+    "max_health": 120, "attack": 25, "defense": 8, "healing_ability": 20,
+    "max_mana": 100, "mana_cost": 25, "special_attack_damage": 45,
+    "karma": 50, "max_stamina": 100, "accuracy": 0.8, "evasion": 0.1, "critical_chance": 0.15
+}
+CONFIG_2 = {
+    "max_health": 110, "attack": 23, "defense": 10, "healing_ability": 18,
+    "max_mana": 110, "mana_cost": 30, "special_attack_damage": 40,
+    "karma": 50, "max_stamina": 100, "accuracy": 0.82, "evasion": 0.12, "critical_chance": 0.12
+}
 
 def print_status(entities, turn):
     print("\n" + "="*70)
@@ -27,55 +46,160 @@ def print_deity_stats(brahma, vishnu, shiva):
     print(f"Shiva: Interventions = {shiva.interventions}, Total Decay Inflicted = {shiva.total_decay_inflicted:.1f}, Remaining Energy = {shiva.divine_energy:.1f}")
     print("="*70 + "\n")
 
-def main():
-    config1 = {
-        "max_health": 120, "attack": 25, "defense": 8, "healing_ability": 20,
-        "max_mana": 100, "mana_cost": 25, "special_attack_damage": 45,
-        "karma": 50, "max_stamina": 100, "accuracy": 0.8, "evasion": 0.1, "critical_chance": 0.15
-    }
-    config2 = {
-        "max_health": 110, "attack": 23, "defense": 10, "healing_ability": 18,
-        "max_mana": 110, "mana_cost": 30, "special_attack_damage": 40,
-        "karma": 50, "max_stamina": 100, "accuracy": 0.82, "evasion": 0.12, "critical_chance": 0.12
-    }
-    gods = get_all_gods()
-    entity1 = Priest("High Priest Tenzin", gods=gods, config=config1)
-    entity2 = Entity("Entity2", config=config2)
-    entity3 = Mechanist("Entity3")
-    entity4 = Intern("Intern Greg")
-
-    entities = [entity1, entity2, entity3, entity4]
-
-    brahma = gods["brahma"]
-    vishnu = gods["vishnu"]
-    shiva = gods["shiva"]
-    cosmic = CosmicEvent()
-    turn = 0
-    max_turns = 50
-
-    while len([e for e in entities if e.is_alive()]) > 1 and turn < max_turns:
-        turn += 1
-        print(f"\n{'-'*20} Turn {turn} {'-'*20}\n")
-        cosmic.apply_event(entity1, entity2, brahma, vishnu, shiva)
+def classic_roster(gods, logger=None):
+    return [
+        Priest("High Priest Tenzin", gods=gods, config=dict(CONFIG_1), logger=logger),
+        Entity("Entity2", config=dict(CONFIG_2), logger=logger),
+        Mechanist("Entity3", logger=logger),
+        Intern("Intern Greg", logger=logger),
+    ]
+
+def priest_vs_mechanist(gods, logger=None):
+    return [
+        Priest("High Priest Tenzin", gods=gods, config=dict(CONFIG_1), logger=logger),
+        Mechanist("Entity3", logger=logger),
+    ]
+
+def entity_vs_intern(gods, logger=None):
+    return [
+        Entity("Entity2", config=dict(CONFIG_2), logger=logger),
+        Intern("Intern Greg", logger=logger),
+    ]
+
+FACTIONS = ("Dawn", "Dusk", "Ember", "Void")
+
+def royale_roster(gods, logger=None, size=100):
+    """`size` combatants cycling through every class, spread over FACTIONS.
+
+    Classes cycle with every combatant and factions with every four, so
+    each faction gets a mix of all four classes.
+    """
+    roster = []
+    for i in range(size):
+        name = f"Fighter {i + 1:03d}"
+        config = {"faction": FACTIONS[(i // 4) % len(FACTIONS)]}
+        kind = i % 4
+        if kind == 0:
+            roster.append(Priest(name, gods=gods, config={**CONFIG_1, **config}, logger=logger))
+        elif kind == 1:
+            roster.append(Entity(name, config={**CONFIG_2, **config}, logger=logger))
+        elif kind == 2:
+            roster.append(Mechanist(name, config=config, logger=logger))
+        else:
+            roster.append(Intern(name, config=config, logger=logger))
+    return roster
+
+ROSTERS = {
+    "classic": classic_roster,
+    "priest_vs_mechanist": priest_vs_mechanist,
+    "entity_vs_intern": entity_vs_intern,
+    "royale": royale_roster,
+}
+
+@dataclass
+class BattleResult:
+    winner: str | None
+    turns: int
+    survivors: list[str] = field(default_factory=list)
+    interventions: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def stalemate(self):
+        return self.winner is None
+
+
+class Battle:
+    """One battle: cosmic event, entity turns, god influence and trade every 5 turns.
+
+    With a `seed`, the battle, every entity, every god and the cosmos each
+    draw from their own stream derived from it, so the battle replays
+    identically regardless of what else runs in the process. Without one
+    everything shares the global `random` module.
+
+    A `recorder` (replay.ReplayRecorder) needs `log` to be the CombatLog
+    shared by the entities, gods and cosmos.
+
+    With a `grid` (spatial.SpatialGrid holding the entities), each entity
+    attacks a random living opponent from the nearest occupied cells
+    instead of anyone on the field.
+
+    With `teams`, entities only attack other factions and the last faction
+    standing wins; the result's winner is then the faction name.
+    """
 
+    def __init__(self, entities, gods, cosmic=None, max_turns=50, log=None, seed=None, recorder=None, grid=None, teams=False):
+        self.entities = list(entities)
+        self.state = BattleState(self.entities, teams)
+        self.gods = gods
+        self.cosmic = cosmic or CosmicEvent(logger=log)
+        self.max_turns = max_turns
+        self.log = log
+        self.recorder = recorder
+        self.grid = grid
+        self.turn = 0
+        self.cosmic_event = None
+        if recorder:
+            recorder.attach(log)
+        self.rng = random
+        if seed is not None:
+            self.rng = stream(seed, "battle")
+            self.cosmic.rng = stream(seed, "cosmos")
+            for i, e in enumerate(self.entities):
+                e.rng = stream(seed, "entity", i)
+            for key, god in gods.items():
+                god.rng = stream(seed, "god", key)
+
+    def alive(self):
+        return self.state.alive()
+
+    def is_over(self):
+        return self.turn >= self.max_turns or self.state.is_decided()
+
+    def step(self):
+        entities = self.entities
+        rng = self.rng
+        recorder = self.recorder
+        entity1, entity2 = entities[0], entities[1]
+        brahma = self.gods["brahma"]
+        vishnu = self.gods["vishnu"]
+        shiva = self.gods["shiva"]
+
+        self.turn += 1
+        turn = self.turn
+        if self.log:
+            self.log.turn = turn
+        if recorder:
+            recorder.start_turn(turn)
+        state = self.state
+        self.cosmic_event = self.cosmic.apply_event(state.living, self.gods)
+
+        grid = self.grid
         for e in entities:
             if not e.is_alive():
                 continue
-            opponents = [op for op in entities if op != e and op.is_alive()]
-            if opponents:
-                target = random.choice(opponents)
+            if grid:
+                target = grid.pick_target(e, rng, (lambda other, e=e: other.faction != e.faction) if state.teams else None)
+            else:
+                target = state.pick_opponent(e, rng)
+            if target:
+                if recorder:
+                    recorder.begin(e, target)
                 if isinstance(e, Priest) and turn % 4 == 0:
                     e.ability(target)
                 else:
                     e.take_turn(target)
+                if recorder:
+                    recorder.end()
 
-        favored = random.choices([entity1, entity2], weights=[0.6, 0.4])[0]
-        others = [e for e in entities if e != favored and e.is_alive()]
-        if others:
-            target = random.choice(others)
-            brahma.influence_battle(favored, target)
-            vishnu.influence_battle(favored, target)
-            shiva.influence_battle(favored, target)
+        favored = rng.choices([entity1, entity2], weights=[0.6, 0.4])[0]
+        target = state.pick_other(favored, rng)
+        if target:
+            for god in (brahma, vishnu, shiva):
+                if recorder:
+                    recorder.begin(god, others=(favored, target))
+                god.influence_battle(favored, target)
+                if recorder:
+                    recorder.end()
 
         if turn % 5 == 0:
             if entity1.health < 50 and entity1.inventory.get("health_potion", 0) < 1 and entity2.inventory.get("health_potion", 0) > 0:
@@ -84,16 +208,112 @@ def main():
                 if entity1.propose_trade(entity2, offer, request):
                     entity2.accept_trade(entity1, offer, request)
 
-        print_status(entities, turn)
+        if recorder:
+            recorder.end_turn()
+
+    def result(self):
+        return BattleResult(
+            winner=self.state.winner(),
+            turns=self.turn,
+            survivors=[e.name for e in self.alive()],
+            interventions={key: god.interventions for key, god in self.gods.items()},
+        )
+
+
+def run_battle(roster="classic", max_turns=50, seed=None, log=None, replay=None, spatial=False, teams=False):
+    """Run one battle headless (no printing, no sleeping) and return its BattleResult.
+
+    `roster` is a key of ROSTERS or a callable taking (gods, logger) and
+    returning the list of combatants. `log` defaults to a CombatLog with
+    no sink, so no event is ever formatted. `replay` is an optional path
+    to record the battle to (see replay.py). `spatial` scatters the roster
+    on a map and has everyone fight their neighbours (see spatial.py).
+    `teams` fights it out between factions (see Battle).
+    """
+    log = log or CombatLog(sink=None)
+    gods = get_all_gods(logger=log)
+    factory = ROSTERS[roster] if isinstance(roster, str) else roster
+    entities = factory(gods, logger=log)
+    cosmic = CosmicEvent(logger=log)
+    recorder = ReplayRecorder(replay, entities, gods, cosmic) if replay else None
+    grid = SpatialGrid.scatter(entities, stream(seed, "map") if seed is not None else random) if spatial else None
+    try:
+        battle = Battle(entities, gods, cosmic, max_turns, log=log, seed=seed, recorder=recorder, grid=grid, teams=teams)
+        while not battle.is_over():
+            battle.step()
+    finally:
+        if recorder:
+            recorder.close()
+    return battle.result()
+
+def run_batch(battles, roster="classic", max_turns=50, seed=None, notes=None, spatial=False, teams=False):
+    wins = {}
+    stalemates = 0
+    total_turns = 0
+    sink = None
+    if notes:
+        from event_sink import NoteSink  # sqlite3 only when notes are wanted
+        sink = NoteSink(notes)
+    start = time.perf_counter()
+    for i in range(battles):
+        log = CombatLog(sink=None)
+        if sink:
+            sink.attach(log, observer=f"battle-{i}")
+        result = run_battle(roster, max_turns, None if seed is None else derive_seed(seed, i), log=log, spatial=spatial, teams=teams)
+        total_turns += result.turns
+        if result.stalemate:
+            stalemates += 1
+        else:
+            wins[result.winner] = wins.get(result.winner, 0) + 1
+    elapsed = time.perf_counter() - start
+    if sink:
+        sink.close()
+        print(f"Wrote {sink.written} events to {notes}")
+
+    print(f"{battles} battles in {elapsed:.2f}s ({battles / elapsed:.0f} battles/s), mean {total_turns / battles:.1f} turns")
+    for name, count in sorted(wins.items(), key=lambda x: x[1], reverse=True):
+        print(f"{name:<20} {count:>7} wins ({count / battles:.1%})")
+    print(f"{'Stalemate':<20} {stalemates:>7}      ({stalemates / battles:.1%})")
+
+def main():
+    log = CombatLog(print)
+    gods = get_all_gods(logger=log)
+    entities = classic_roster(gods, logger=log)
+    battle = Battle(entities, gods, log=log)
+
+    while not battle.is_over():
+        print(f"\n{'-'*20} Turn {battle.turn + 1} {'-'*20}\n")
+        battle.step()
+        print_status(entities, battle.turn)
         time.sleep(1)
 
-    alive = [e for e in entities if e.is_alive()]
-    if len(alive) == 1:
-        print(f"{alive[0].name} wins after {turn} turns!")
+    winner = battle.state.winner()
+    if winner:
+        print(f"{winner} wins after {battle.turn} turns!")
     else:
-        print("After 50 intense turns, the war ends in a stalemate!")
+        print(f"After {battle.turn} intense turns, the war ends in a stalemate!")
 
-    print_deity_stats(brahma, vishnu, shiva)
+    print_deity_stats(gods["brahma"], gods["vishnu"], gods["shiva"])
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Cosmic war battlefield")
+    parser.add_argument("-n", "--battles", type=int, help="run N headless battles back to back instead of the live demo")
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--roster", choices=sorted(ROSTERS), default="classic")
+    parser.add_argument("--replay", help="run one headless battle and record it to this file")
+    parser.add_argument("--notes", help="write every combat event of a --battles run to this SQLite file")
+    parser.add_argument("--spatial", action="store_true", help="scatter the roster on a map; combatants fight their neighbours")
+    parser.add_argument("--teams", action="store_true", help="factions fight as teams; the last faction standing wins")
+    args = parser.parse_args()
+    if args.replay or args.battles:
+        try:
+            if args.replay:
+                result = run_battle(args.roster, args.turns, args.seed, replay=args.replay, spatial=args.spatial, teams=args.teams)
+                print(f"Recorded {result.turns} turns to {args.replay}: winner {result.winner or 'none (stalemate)'}")
+            else:
+                run_batch(args.battles, args.roster, args.turns, args.seed, args.notes, args.spatial, args.teams)
+        except ValueError as e:
+            parser.error(str(e))  # e.g. --teams with a single-faction roster
+    else:
+        main()
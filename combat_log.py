@@ -0,0 +1,110 @@
+# combat_log.py
+# Structured, level-gated combat logging. Callers emit an event code plus
+# the raw arguments (source, target, value, *extra); the message template
+# is only formatted when a text sink is enabled for the event's level, so a
+# disabled log costs one dict lookup and a comparison per event.
+#
+# Structured handlers (replay recorders, event sinks, ...) receive
+# (turn, level, code, args) without any formatting.
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+OFF = 100
+
+# code: (level, template). Template fields: {0} source, {1} target, {2} value, {3}+ extras
+EVENTS = {
+    # Entity
+    "rest": (INFO, "{0} rests and recovers {2:.1f} stamina and {3:.1f} mana."),
+    "damage": (DEBUG, "{0} takes {2:.1f} damage (blocked {3:.1f})"),
+    "heal": (INFO, "{0} heals for {2} (Health: {3:.1f}), karma now {4}."),
+    "defend": (INFO, "{0} takes a defensive stance, boosting defense temporarily."),
+    "trade_proposed": (INFO, "{0} proposes trade to {1}: {3} for {4}"),
+    "trade_failed": (INFO, "{0}'s trade proposal failed due to insufficient items."),
+    "trade_accepted": (INFO, "{0} accepted trade with {1}: {3} for {4}"),
+    "health_potion": (INFO, "{0} uses a health potion and heals {2} HP."),
+    "mana_potion": (INFO, "{0} uses a mana potion and recovers {2} mana."),
+    "stamina_boost": (INFO, "{0} uses a stamina boost and recovers {2} stamina."),
+    "no_health_potion": (DEBUG, "{0} has no health potions!"),
+    "no_mana_potion": (DEBUG, "{0} has no mana potions!"),
+    "no_stamina_boost": (DEBUG, "{0} has no stamina boosts!"),
+    # Attacks
+    "lacks_stamina": (DEBUG, "{0} lacks stamina for {3}!"),
+    "lacks_mana": (DEBUG, "{0} lacks mana for {3}!"),
+    "attack_missed": (INFO, "{0}'s {3} missed {1}!"),
+    "attack_hit": (INFO, "{0} used {3} on {1} for {2:.1f} actual damage."),
+    # Priest
+    "priest_recharging": (DEBUG, "{0} is spiritually recharging. ({2} turns left)"),
+    "priest_no_mana": (INFO, "{0} whispers to the heavens... but lacks mana."),
+    "priest_brahma": (INFO, "{0} calls upon Brahma to heal {1} for {2:.1f} HP."),
+    "priest_vishnu": (INFO, "{0} invokes Vishnu to bless {1}: +{2:.1f} HP, +{3:.1f} Mana."),
+    "priest_shiva": (INFO, "{0} begs Shiva to cleanse decay from {1}: +{2:.1f} HP recovered."),
+    "priest_unanswered": (INFO, "{0} prays desperately... but no god responds."),
+    # Mechanist
+    "emp_pulse": (INFO, "{0} emits an EMP pulse, disabling {1}'s magic channels!"),
+    "overdrive": (INFO, "{0} activates Overdrive! Unleashes {2:.1f} damage using excess heat."),
+    "reroute_healing": (INFO, "{0} reroutes divine healing into mechanical stamina recovery."),
+    "repair_gel": (INFO, "{0} applies a nano-repair gel and restores {2} HP."),
+    "no_repair_gel": (DEBUG, "{0} has no repair gels available."),
+    # Intern
+    "intern_forgot": (INFO, "{0}: Forgot what they were doing. Takes no action."),
+    "intern_panic": (INFO, "{0} enters Panic Productivity mode!"),
+    "intern_attempt": (DEBUG, "{0}: Nervously attempting {3}..."),
+    "intern_crash": (INFO, "{0} crashes from caffeine overload. Back to normal."),
+    # Gods
+    "god_idle": (DEBUG, "{0} finds no mortal worthy of aid."),
+    "god_heal": (INFO, "{0} heals {1} for {2:.1f} HP. (Cost: {3:.1f} energy)"),
+    "god_mana": (INFO, "{0} grants mana to {1}: +{2:.1f} MP (Cost: {3:.1f} energy)"),
+    "god_decay": (INFO, "{0} inflicts decay on {1}: -{2:.1f} HP (Cost: {3:.1f} energy)"),
+    # Cosmos
+    "cosmic_event": (INFO, "\n*** Cosmic Event: {0} - {3} ***"),
+    # Free text written through CombatLog.__call__
+    "message": (INFO, "{0}"),
+}
+
+
+class CombatLog:
+    """Routes combat events to an optional text sink and structured handlers.
+
+    `sink` is any callable taking a string (print, WarGUI.log, ...) or None
+    for no text output. Only events at or above `level` reach the sink.
+    """
+
+    def __init__(self, sink=print, level=DEBUG):
+        self.sink = sink
+        self.level = level if sink else OFF
+        self.handlers = []
+        self.turn = 0
+        self._threshold = self.level
+
+    def add_handler(self, handler, level=DEBUG):
+        """Call handler(turn, level, code, args) for every event at or above `level`."""
+        self.handlers.append((level, handler))
+        self._threshold = min(self.level, *(lvl for lvl, _ in self.handlers))
+
+    def set_level(self, level):
+        self.level = level if self.sink else OFF
+        self._threshold = min(self.level, *(lvl for lvl, _ in self.handlers), OFF)
+
+    def enabled(self, level):
+        return level >= self._threshold
+
+    def emit(self, code, *args):
+        level = EVENTS[code][0]
+        if level < self._threshold:
+            return
+        if level >= self.level:
+            self.sink(EVENTS[code][1].format(*args))
+        for handler_level, handler in self.handlers:
+            if level >= handler_level:
+                handler(self.turn, level, code, args)
+
+    def __call__(self, message):
+        self.emit("message", message)
+
+
+def as_log(logger):
+    """Wrap a plain callable (or None, meaning print) in a CombatLog."""
+    if isinstance(logger, CombatLog):
+        return logger
+    return CombatLog(logger or print)
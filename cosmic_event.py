@@ -1,84 +1,150 @@
 # cosmic_event.py
+# Cosmic events: a registry of effects the cosmos rolls once per turn.
+#
+# Each event class declares, once, when it is registered:
+#   targets   what apply() gets as its first argument: "combatants" (every
+#             living combatant) or "gods" (every god)
+#   needs     keys of specific gods apply() also takes, in order
+#   duration  how many turns the effect is applied
+#   stacking  what rolling it again while it is active does: "refresh"
+#             (restart the duration), "extend" (add another duration) or
+#             "stack" (a second copy applies alongside the first)
+# so dispatch is a plain call with no per-turn reflection, and events work
+# on rosters of any size.
+#
+# Combat modifiers (attack, accuracy, evasion) and the gods' cost
+# multipliers last one turn: every turn the cosmos resets them, then
+# applies every active event again.
+
 import random
-import inspect
+from combat_log import as_log
+
+TARGETS = ("combatants", "gods")
+STACKING = ("refresh", "extend", "stack")
+GODS = ("brahma", "vishnu", "shiva")
+
+# name -> event class, in registration order
+EVENTS = {}
+
+
+def register(cls):
+    """Class decorator adding a cosmic event to EVENTS after checking its declarations."""
+    if cls.targets not in TARGETS:
+        raise ValueError(f"{cls.__name__}: targets must be one of {TARGETS}, not {cls.targets!r}")
+    if cls.stacking not in STACKING:
+        raise ValueError(f"{cls.__name__}: stacking must be one of {STACKING}, not {cls.stacking!r}")
+    unknown = [key for key in cls.needs if key not in GODS]
+    if unknown:
+        raise ValueError(f"{cls.__name__}: unknown gods {unknown}")
+    if cls.duration < 1:
+        raise ValueError(f"{cls.__name__}: duration must be at least 1 turn")
+    if cls.name in EVENTS:
+        raise ValueError(f"cosmic event {cls.name!r} is already registered")
+    EVENTS[cls.name] = cls
+    return cls
+
 
 class BaseCosmicEvent:
     name = "Unnamed Event"
     description = "No description."
     duration = 1
+    stacking = "refresh"
+    targets = "combatants"
+    needs = ()
 
-    def apply(self, e1, e2, brahma, vishnu, shiva):
+    def apply(self, targets, *gods):
         pass
 
+
+@register
 class CelestialAlignment(BaseCosmicEvent):
     name = "Celestial Alignment"
     description = "A rare alignment boosts combat effectiveness."
 
-    def apply(self, e1, e2, *_):
-        e1.attack *= 1.1
-        e2.attack *= 1.1
-        e1.mana = min(e1.mana + 5, e1.max_mana)
-        e2.mana = min(e2.mana + 5, e2.max_mana)
+    def apply(self, targets):
+        for e in targets:
+            e.attack *= 1.1
+            e.mana = min(e.mana + 5, e.max_mana)
 
+@register
 class CosmicDrought(BaseCosmicEvent):
     name = "Cosmic Drought"
     description = "Cosmic energies are low; mana recovery suffers."
 
-    def apply(self, e1, e2, *_):
-        e1.attack *= 0.95
-        e2.attack *= 0.95
-        e1.mana = min(e1.mana - 5, e1.max_mana)
-        e2.mana = min(e2.mana - 5, e2.max_mana)
+    def apply(self, targets):
+        for e in targets:
+            e.attack *= 0.95
+            e.mana = min(e.mana - 5, e.max_mana)
 
+@register
 class MysticWinds(BaseCosmicEvent):
     name = "Mystic Winds"
     description = "Evasive winds aid dodging—accuracy and evasion are slightly improved."
 
-    def apply(self, e1, e2, *_):
-        e1.accuracy += 0.05
-        e2.accuracy += 0.05
-        e1.evasion += 0.05
-        e2.evasion += 0.05
+    def apply(self, targets):
+        for e in targets:
+            e.accuracy += 0.05
+            e.evasion += 0.05
 
+@register
 class AstralSurge(BaseCosmicEvent):
     name = "Astral Surge"
     description = "A surge of astral energy empowers divine intervention, reducing their cost by 50% this turn."
+    targets = "gods"
 
-    def apply(self, *_entities, brahma, vishnu, shiva):
-        brahma.cost_multiplier = 0.5
-        vishnu.cost_multiplier = 0.5
-        shiva.cost_multiplier = 0.5
+    def apply(self, targets):
+        for god in targets:
+            god.cost_multiplier = 0.5
 
+@register
 class TemporalFlux(BaseCosmicEvent):
     name = "Temporal Flux"
     description = "Time seems to slow, allowing better recovery of stamina."
 
-    def apply(self, e1, e2, *_):
-        e1.recover_stamina(10)
-        e2.recover_stamina(10)
+    def apply(self, targets):
+        for e in targets:
+            e.recover_stamina(10)
+
 
 class CosmicEvent:
-    def __init__(self):
-        self.events = [
-            CelestialAlignment(),
-            CosmicDrought(),
-            MysticWinds(),
-            AstralSurge(),
-            TemporalFlux()
-        ]
-
-    def apply_event(self, e1, e2, brahma, vishnu, shiva):
-        e1.reset_modifiers()
-        e2.reset_modifiers()
-
-        event = random.choice(self.events)
-        print(f"\n*** Cosmic Event: {event.name} - {event.description} ***")
-
-    # Inspect the method signature
-        apply_sig = inspect.signature(event.apply)
-        if 'brahma' in apply_sig.parameters:
-            event.apply(e1, e2, brahma=brahma, vishnu=vishnu, shiva=shiva)
-        else:
-            event.apply(e1, e2)
-
-        return event
\ No newline at end of file
+    """Rolls one registered event per turn and applies every active one.
+
+    `events` is a list of event classes (default: everything in EVENTS).
+    """
+
+    def __init__(self, logger=None, events=None):
+        self.logger = as_log(logger)
+        self.rng = random
+        self.events = [cls() for cls in (events or EVENTS.values())]
+        # [event, turns left], in the order they were rolled
+        self.active = []
+
+    def roll(self, event):
+        if event.stacking != "stack":
+            for effect in self.active:
+                if effect[0] is event:
+                    effect[1] = event.duration if event.stacking == "refresh" else effect[1] + event.duration
+                    return
+        self.active.append([event, event.duration])
+
+    def apply_event(self, combatants, gods):
+        """Start a new turn for the living `combatants` and the `gods` mapping; returns the event rolled."""
+        for e in combatants:
+            e.reset_modifiers()
+        for god in gods.values():
+            god.cost_multiplier = 1.0
+
+        event = self.rng.choice(self.events)
+        self.logger.emit("cosmic_event", event.name, None, None, event.description)
+        self.roll(event)
+
+        for effect in self.active:
+            active = effect[0]
+            targets = combatants if active.targets == "combatants" else gods.values()
+            if active.needs:
+                active.apply(targets, *[gods[key] for key in active.needs])
+            else:
+                active.apply(targets)
+            effect[1] -= 1
+        self.active = [effect for effect in self.active if effect[1] > 0]
+        return event
@@ -1,9 +1,16 @@
 import random
-from attack_types import NormalAttack, HeavyAttack, QuickAttack, MagicAttack
+from array import array
+from attack_types import ATTACKS
+from combat_log import as_log
+from policy import ACTION_WEIGHTS, ATTACK_WEIGHTS, policy_for
 
-def weighted_choice(choices):
+ITEMS = ("health_potion", "mana_potion", "stamina_boost", "karma_scroll")
+ITEM_IDS = {item: i for i, item in enumerate(ITEMS)}
+STARTING_ITEMS = (2, 2, 1, 1)
+
+def weighted_choice(choices, rng=random):
     total = sum(weight for action, weight in choices)
-    r = random.uniform(0, total)
+    r = rng.uniform(0, total)
     upto = 0
     for action, weight in choices:
         if upto + weight >= r:
@@ -11,14 +18,65 @@ def weighted_choice(choices):
         upto += weight
     return choices[-1][0]
 
+class Inventory:
+    """Fixed-size item counters indexed by item id (see ITEMS), with the dict API trades use."""
+    __slots__ = ("counts",)
+
+    def __init__(self, counts=STARTING_ITEMS):
+        self.counts = array("i", counts)
+
+    def get(self, item, default=0):
+        item_id = ITEM_IDS.get(item)
+        return default if item_id is None else self.counts[item_id]
+
+    def __getitem__(self, item):
+        return self.counts[ITEM_IDS[item]]
+
+    def __setitem__(self, item, qty):
+        self.counts[ITEM_IDS[item]] = qty
+
+    def __contains__(self, item):
+        return item in ITEM_IDS
+
+    def __iter__(self):
+        return iter(ITEMS)
+
+    def __len__(self):
+        return len(ITEMS)
+
+    def items(self):
+        return zip(ITEMS, self.counts)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
 class Entity:
+    __slots__ = (
+        "name", "player_id", "faction", "logger",
+        "max_health", "health", "base_attack", "attack", "defense",
+        "max_mana", "mana", "max_stamina", "stamina", "mana_cost",
+        "special_attack_damage", "healing_ability", "karma",
+        "base_accuracy", "accuracy", "base_evasion", "evasion", "critical_chance", "heal_turns",
+        "inventory", "rng", "state",
+    )
+    # Attack strategies are stateless and shared by every entity
+    attack_map = ATTACKS
+    # Precomputed samplers over the resource-gated options (see policy.py)
+    action_policy = policy_for(ACTION_WEIGHTS, "defend")
+    attack_policy = policy_for(ATTACK_WEIGHTS, "rest")
+
     def __init__(self, name, config=None, logger = None):
         config = config or {}
 
         self.name = name
         self.player_id = config.get("player_id")
         self.faction = config.get("faction", "Neutral")
-        self.logger = logger or config.get("logger", print)
+        self.logger = as_log(logger or config.get("logger"))
+        # Random stream; Battle replaces it with a seeded per-entity stream
+        self.rng = config.get("rng") or random
+        # battle_state.BattleState tracking whether we are alive; set by it
+        self.state = None
 
         # Core stats
         self.max_health = config.get("max_health", 120)
@@ -48,24 +106,13 @@ class Entity:
         self.heal_turns = 0
 
         # Inventory system
-        self.inventory = {
-            "health_potion": 2,
-            "mana_potion": 2,
-            "stamina_boost": 1,
-            "karma_scroll": 1,
-        }
-        self.attack_map = {
-            "normal_attack": NormalAttack(),
-            "heavy_attack": HeavyAttack(),
-            "quick_attack": QuickAttack(),
-            "magic_attack": MagicAttack()
-        }
+        self.inventory = Inventory()
 
     def __str__(self):
         return f"{self.name} | HP: {self.health:.1f}/{self.max_health} | Mana: {self.mana:.1f} | Stamina: {self.stamina:.1f} | Karma: {self.karma}"
 
-    def log(self, message):
-        self.logger(f"{self.name}: {message}")
+    def log(self, code, *args):
+        self.logger.emit(code, self.name, *args)
 
     def recover_stamina(self, amount=10):
         self.stamina = min(self.stamina + amount, self.max_stamina)
@@ -76,64 +123,55 @@ class Entity:
         self.evasion = self.base_evasion
 
     def rest(self):
-        recovered_stamina = random.uniform(15, 25)
-        recovered_mana = random.uniform(5, 10)
+        recovered_stamina = self.rng.uniform(15, 25)
+        recovered_mana = self.rng.uniform(5, 10)
         self.stamina = min(self.stamina + recovered_stamina, self.max_stamina)
         self.mana = min(self.mana + recovered_mana, self.max_mana)
-        self.log(f"{self.name} rests and recovers {recovered_stamina:.1f} stamina and {recovered_mana:.1f} mana.")
+        self.log("rest", None, recovered_stamina, recovered_mana)
 
     def take_damage(self, damage):
         actual_damage = max(damage - self.defense, 0)
         blocked = max(0, damage - actual_damage)
-        self.health = max(0, self.health - actual_damage)
-        self.log(f"{self.name} takes {actual_damage:.1f} damage (blocked {blocked:.1f})")
+        before = self.health
+        self.health = max(0, before - actual_damage)
+        if self.health <= 0 < before and self.state:
+            self.state.fallen(self)
+        self.log("damage", None, actual_damage, blocked)
         return actual_damage
 
+    def restore_health(self, amount):
+        """Heal by up to `amount` (capped at max_health), reviving if we had fallen; returns HP restored.
+
+        A negative `amount` (a god's blessing gone sour) can also kill.
+        """
+        before = self.health
+        self.health = min(before + amount, self.max_health)
+        if self.state and (before > 0) != (self.health > 0):
+            if self.health > 0:
+                self.state.revived(self)
+            else:
+                self.state.fallen(self)
+        return self.health - before
+
     def heal(self):
         healed = min(self.healing_ability, self.max_health - self.health)
         self.health += healed
         self.heal_turns += 1
         self.karma += 5
         self.recover_stamina(15)
-        self.log(f"{self.name} heals for {healed} (Health: {self.health:.1f}), karma now {self.karma}.")
+        self.log("heal", None, healed, self.health, self.karma)
 
     def defend(self):
         self.defense += 5
         self.stamina -= 5
-        self.log(f"{self.name} takes a defensive stance, boosting defense temporarily.")
+        self.log("defend")
 
     def choose_attack(self, opponent):
-        attack_options = []
-        if self.stamina >= 20:
-            attack_options.append(("heavy_attack", 0.3))
-        if self.mana >= self.mana_cost:
-            attack_options.append(("magic_attack", 0.3))
-        if self.stamina >= 5:
-            attack_options.append(("quick_attack", 0.3))
-        if self.stamina >= 10:
-            attack_options.append(("normal_attack", 0.4))
-        if not attack_options:
-            return "rest"
-        return weighted_choice(attack_options)
+        return self.attack_policy.sample(False, self.stamina, self.mana >= self.mana_cost, self.rng.random())
 
     def choose_action(self, opponent):
-        actions = []
         health_ratio = self.health / self.max_health
-        if health_ratio < 0.4:
-            actions.append(("heal", 0.6))
-        if self.stamina < 10:
-            actions.append(("rest", 0.8))
-        if self.stamina >= 20:
-            actions.append(("heavy_attack", 0.3))
-        if self.mana >= self.mana_cost:
-            actions.append(("magic_attack", 0.3))
-        if self.stamina >= 5:
-            actions.append(("quick_attack", 0.3))
-        if self.stamina >= 10:
-            actions.append(("normal_attack", 0.4))
-        if not actions:
-            actions.append(("defend", 0.5))
-        return weighted_choice(actions)
+        return self.action_policy.sample(health_ratio < 0.4, self.stamina, self.mana >= self.mana_cost, self.rng.random())
 
     def take_turn(self, opponent):
         if self.health < 40 and self.inventory.get("health_potion", 0) > 0:
@@ -155,7 +193,7 @@ class Entity:
                 attack = self.attack_map[action]
                 attack.apply(self, opponent)
 
-        self.recover_stamina(random.uniform(5, 10))
+        self.recover_stamina(self.rng.uniform(5, 10))
 
     def is_alive(self):
         return self.health > 0
@@ -164,9 +202,9 @@ class Entity:
     def propose_trade(self, other, offer, request):
         if all(self.inventory.get(item, 0) >= qty for item, qty in offer.items()) and \
            all(other.inventory.get(item, 0) >= qty for item, qty in request.items()):
-            self.log(f"{self.name} proposes trade to {other.name}: {offer} for {request}")
+            self.log("trade_proposed", other.name, None, offer, request)
             return True
-        self.log(f"{self.name}'s trade proposal failed due to insufficient items.")
+        self.log("trade_failed", other.name)
         return False
 
     def accept_trade(self, other, offer, request):
@@ -176,7 +214,7 @@ class Entity:
         for item, qty in request.items():
             self.inventory[item] -= qty
             other.inventory[item] = other.inventory.get(item, 0) + qty
-        self.log(f"{self.name} accepted trade with {other.name}: {offer} for {request}")
+        self.log("trade_accepted", other.name, None, offer, request)
 
     # === Items ===
     def use_health_potion(self):
@@ -184,24 +222,24 @@ class Entity:
             healed = min(30, self.max_health - self.health)
             self.health += healed
             self.inventory["health_potion"] -= 1
-            self.log(f"{self.name} uses a health potion and heals {healed} HP.")
+            self.log("health_potion", None, healed)
         else:
-            self.log(f"{self.name} has no health potions!")
+            self.log("no_health_potion")
 
     def use_mana_potion(self):
         if self.inventory.get("mana_potion", 0) > 0:
             recovered = min(25, self.max_mana - self.mana)
             self.mana += recovered
             self.inventory["mana_potion"] -= 1
-            self.log(f"{self.name} uses a mana potion and recovers {recovered} mana.")
+            self.log("mana_potion", None, recovered)
         else:
-            self.log(f"{self.name} has no mana potions!")
+            self.log("no_mana_potion")
 
     def use_stamina_boost(self):
         if self.inventory.get("stamina_boost", 0) > 0:
             recovered = min(20, self.max_stamina - self.stamina)
             self.stamina += recovered
             self.inventory["stamina_boost"] -= 1
-            self.log(f"{self.name} uses a stamina boost and recovers {recovered} stamina.")
+            self.log("stamina_boost", None, recovered)
         else:
-            self.log(f"{self.name} has no stamina boosts!")
+            self.log("no_stamina_boost")
@@ -0,0 +1,154 @@
+# event_sink.py
+# Structured combat events into greg_notes.db.
+#
+# NoteSink attaches to a CombatLog as a handler. The simulation thread only
+# appends (turn, code, args, observer) to a deque; a background writer
+# thread drains it in batches with executemany inside one transaction, on
+# a WAL-mode connection, so the battle loop never waits on SQLite unless
+# it gets `max_pending` events ahead of the disk. If the writer fails, the
+# sink stops queuing and flush()/close() raise the error.
+#
+# Usage:
+#   sink = NoteSink("greg_notes.db")
+#   sink.attach(log, observer="battle-7")
+#   ... run battles ...
+#   sink.close()
+
+import sqlite3
+import threading
+import time
+from collections import deque
+from numbers import Number
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    turn INTEGER,
+    event_type TEXT,
+    source TEXT,
+    target TEXT,
+    value REAL,
+    context TEXT,
+    observer TEXT,
+    timestamp TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_notes_turn ON notes (turn);
+CREATE INDEX IF NOT EXISTS idx_notes_source_event ON notes (source, event_type);
+CREATE INDEX IF NOT EXISTS idx_notes_target ON notes (target);
+"""
+
+INSERT = "INSERT INTO notes (turn, event_type, source, target, value, context, observer) VALUES (?, ?, ?, ?, ?, ?, ?)"
+
+
+def note_row(turn, code, args, observer):
+    """Map a combat log event (source, target, value, *extras) onto a notes row."""
+    source = args[0] if args else None
+    target = args[1] if len(args) > 1 else None
+    value = args[2] if len(args) > 2 and isinstance(args[2], Number) else None
+    context = ", ".join(str(extra) for extra in args[3:]) or None
+    return (turn, code, None if source is None else str(source),
+            None if target is None else str(target), value, context, observer)
+
+
+class NoteSink:
+    """Batched background writer of combat events into the notes table."""
+
+    def __init__(self, path="greg_notes.db", batch_size=5000, flush_interval=0.2, max_pending=200000):
+        self.path = str(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.written = 0
+        self._writing = 0  # set while a batch is off the queue but not yet committed
+        self._queue = deque()
+        self._closed = threading.Event()
+        self._ready = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="NoteSink", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error:
+            raise self._error
+
+    def attach(self, log, observer=None):
+        """Record every event emitted on `log` (a CombatLog) from now on."""
+        queue = self._queue
+        append = queue.append
+        max_pending = self.max_pending
+
+        def handler(turn, level, code, args):
+            if len(queue) >= max_pending:
+                self._wait_for_room()
+            if self._error is None:
+                append((turn, code, args, observer))
+
+        log.add_handler(handler)
+        return handler
+
+    def _run(self):
+        try:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+
+        queue = self._queue
+        try:
+            while True:
+                closing = self._closed.is_set()
+                batch = []
+                self._writing = 1
+                while queue and len(batch) < self.batch_size:
+                    batch.append(note_row(*queue.popleft()))
+                if batch:
+                    with conn:
+                        conn.executemany(INSERT, batch)
+                    self.written += len(batch)
+                self._writing = 0
+                if batch:
+                    continue
+                if closing:
+                    break
+                self._closed.wait(self.flush_interval)
+        except Exception as e:
+            self._error = e
+            queue.clear()
+        finally:
+            conn.close()
+
+    def _wait_for_room(self):
+        # Backpressure: the simulation waits while the writer is max_pending behind
+        while len(self._queue) >= self.max_pending and self._error is None and self._thread.is_alive():
+            time.sleep(0.001)
+
+    def pending(self):
+        return len(self._queue)
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far has been written; raises if the writer failed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while (self._queue or self._writing) and self._thread.is_alive():
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        if self._error:
+            raise self._error
+        return True
+
+    def close(self):
+        """Write what is queued and stop the writer; raises if it failed."""
+        self._closed.set()
+        self._thread.join()
+        if self._error:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
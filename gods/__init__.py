@@ -1,10 +1,12 @@
+from combat_log import as_log
 from .brahma import Brahma
 from .shiva import Shiva
 from .vishnu import Vishnu
 
-def get_all_gods():
+def get_all_gods(logger=None):
+    logger = as_log(logger)
     return {
-        "brahma": Brahma(),
-        "shiva": Shiva(),
-        "vishnu": Vishnu()
+        "brahma": Brahma(logger=logger),
+        "shiva": Shiva(logger=logger),
+        "vishnu": Vishnu(logger=logger)
     }
\ No newline at end of file
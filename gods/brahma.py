@@ -1,5 +1,6 @@
 # brahma.py
 import random
+from combat_log import as_log
 
 def get_priority_score(entity):
     health_ratio = entity.health / entity.max_health
@@ -9,13 +10,15 @@ def get_priority_score(entity):
     return danger_score + (karma_weight * 0.5) + critical_bonus
 
 class Brahma:
-    def __init__(self):
+    def __init__(self, logger=None):
         self.name = "Brahma"
         self.cooldown = 0
         self.divine_energy = 100.0
         self.interventions = 0
         self.total_health_restored = 0.0
         self.cost_multiplier = 1.0
+        self.logger = as_log(logger)
+        self.rng = random
 
     def influence_battle(self, c1, c2):
         if self.cooldown > 0 or self.divine_energy <= 0:
@@ -27,18 +30,16 @@ class Brahma:
         target, score = priorities[0]
 
         if score < 0.4:
-            print(f"{self.name} finds no mortal worthy of aid.")
+            self.logger.emit("god_idle", self.name)
             return
 
-        heal_amt = 20 + random.uniform(-5, 5)
-        before = target.health
-        target.health = min(target.health + heal_amt, target.max_health)
-        actual_heal = target.health - before
+        heal_amt = 20 + self.rng.uniform(-5, 5)
+        actual_heal = target.restore_health(heal_amt)
 
         cost = actual_heal * 0.2 * self.cost_multiplier
         self.divine_energy -= cost
         self.total_health_restored += actual_heal
         self.interventions += 1
 
-        print(f"{self.name} heals {target.name} for {actual_heal:.1f} HP. (Cost: {cost:.1f} energy)")
-        self.cooldown = random.randint(1, 3)
+        self.logger.emit("god_heal", self.name, target.name, actual_heal, cost)
+        self.cooldown = self.rng.randint(1, 3)
@@ -1,15 +1,18 @@
 # shiva.py
 import random
+from combat_log import as_log
 from gods.brahma import get_priority_score
 
 class Shiva:
-    def __init__(self):
+    def __init__(self, logger=None):
         self.name = "Shiva"
         self.cooldown = 0
         self.divine_energy = 90.0
         self.interventions = 0
         self.total_decay_inflicted = 0.0
         self.cost_multiplier = 1.0
+        self.logger = as_log(logger)
+        self.rng = random
 
     def influence_battle(self, c1, c2):
         if self.cooldown > 0 or self.divine_energy <= 0:
@@ -19,7 +22,7 @@ class Shiva:
         # Shiva punishes the lowest karma
         target = c1 if c1.karma < c2.karma else c2
 
-        decay = 10 + (50 - target.karma) * 0.2 + random.uniform(-2, 2)
+        decay = 10 + (50 - target.karma) * 0.2 + self.rng.uniform(-2, 2)
         decay = max(5, decay)
         target.take_damage(decay)
         self.total_decay_inflicted += decay
@@ -28,5 +31,5 @@ class Shiva:
         self.divine_energy -= cost
         self.interventions += 1
 
-        print(f"{self.name} inflicts decay on {target.name}: -{decay:.1f} HP (Cost: {cost:.1f} energy)")
-        self.cooldown = random.randint(1, 3)
+        self.logger.emit("god_decay", self.name, target.name, decay, cost)
+        self.cooldown = self.rng.randint(1, 3)
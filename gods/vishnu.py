@@ -1,9 +1,10 @@
 # vishnu.py
 import random
+from combat_log import as_log
 from gods.brahma import get_priority_score
 
 class Vishnu:
-    def __init__(self):
+    def __init__(self, logger=None):
         self.name = "Vishnu"
         self.cooldown = 0
         self.divine_energy = 120.0
@@ -11,6 +12,8 @@ class Vishnu:
         self.total_mana_granted = 0.0
         self.total_health_healed = 0.0
         self.cost_multiplier = 1.0
+        self.logger = as_log(logger)
+        self.rng = random
 
     def influence_battle(self, c1, c2):
         if self.cooldown > 0 or self.divine_energy <= 0:
@@ -22,23 +25,21 @@ class Vishnu:
         target, score = targets[0]
 
         if target.health < 0.5 * target.max_health:
-            heal_amt = 15 * (1 + (target.karma - 50) / 100.0 + random.uniform(-0.1, 0.1))
-            before = target.health
-            target.health = min(target.health + heal_amt, target.max_health)
-            actual_heal = target.health - before
+            heal_amt = 15 * (1 + (target.karma - 50) / 100.0 + self.rng.uniform(-0.1, 0.1))
+            actual_heal = target.restore_health(heal_amt)
             self.total_health_healed += actual_heal
             cost = actual_heal * 0.1 * self.cost_multiplier
             self.divine_energy -= cost
-            print(f"{self.name} heals {target.name} for {actual_heal:.1f} health. (Cost: {cost:.1f} energy)")
+            self.logger.emit("god_heal", self.name, target.name, actual_heal, cost)
         else:
-            mana_amt = 10 * (1 + (target.karma - 50) / 100.0 + random.uniform(-0.1, 0.1))
+            mana_amt = 10 * (1 + (target.karma - 50) / 100.0 + self.rng.uniform(-0.1, 0.1))
             before = target.mana
             target.mana = min(target.mana + mana_amt, target.max_mana)
             granted = target.mana - before
             self.total_mana_granted += granted
             cost = granted * 0.1 * self.cost_multiplier
             self.divine_energy -= cost
-            print(f"{self.name} grants mana to {target.name}: +{granted:.1f} MP (Cost: {cost:.1f} energy)")
+            self.logger.emit("god_mana", self.name, target.name, granted, cost)
 
         self.interventions += 1
-        self.cooldown = random.randint(1, 3)
+        self.cooldown = self.rng.randint(1, 3)
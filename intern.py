@@ -1,8 +1,9 @@
 # intern.py
 from entity import Entity
-import random
 
 class Intern(Entity):
+    __slots__ = ("title", "power_trip", "caffeine_level")
+
     def __init__(self, name="Unnamed Intern", config=None, logger=None):
         super().__init__(name, config=config or {}, logger=logger)
         self.title = "Intern"
@@ -11,21 +12,21 @@ class Intern(Entity):
 
     def take_turn(self, opponent):
         # 10% chance they forget to act at all
-        if random.random() < 0.1:
-            self.logger(f"{self.name}: Forgot what they were doing. Takes no action.")
+        if self.rng.random() < 0.1:
+            self.log("intern_forgot")
             self.recover_stamina(5)
             return
 
         # If caffeine is low, activate PANIC PRODUCTIVITY MODE
         if self.caffeine_level < 30 and not self.power_trip:
-            self.logger(f"{self.name} enters Panic Productivity mode!")
+            self.log("intern_panic")
             self.power_trip = True
             self.attack *= 1.5
             self.accuracy += 0.1
             self.stamina += 20
 
         # Random chance to do something helpful... or not
-        chance = random.random()
+        chance = self.rng.random()
         if chance < 0.2:
             self.heal()
         elif chance < 0.4:
@@ -34,14 +35,14 @@ class Intern(Entity):
             action = self.choose_attack(opponent)
             if action in self.attack_map:
                 attack = self.attack_map[action]
-                self.logger(f"{self.name}: Nervously attempting {action}...")
+                self.log("intern_attempt", opponent.name, None, action)
                 attack.apply(self, opponent)
 
-        self.caffeine_level = max(0, self.caffeine_level - random.uniform(5, 15))
+        self.caffeine_level = max(0, self.caffeine_level - self.rng.uniform(5, 15))
 
     def reset_modifiers(self):
         super().reset_modifiers()
         if self.power_trip:
-            self.logger(f"{self.name} crashes from caffeine overload. Back to normal.")
+            self.log("intern_crash")
             self.power_trip = False
             self.caffeine_level = 100
\ No newline at end of file
@@ -1,7 +1,8 @@
 from entity import Entity
-import random
 
 class Mechanist(Entity):
+    __slots__ = ("overclocked", "charge", "heat", "cooldowns")
+
     def __init__(self, name="The Mechanist", config=None, logger = None):
         config = config or {}
         config.update({
@@ -17,7 +18,9 @@ class Mechanist(Entity):
             "evasion": 0.1,
             "critical_chance": 0.0  # No drama, just math
         })
-        super().__init__(name, config={"logger": logger})
+        # Only identity settings are passed on; the stats above are not applied
+        identity = {key: config[key] for key in ("player_id", "faction", "rng") if key in config}
+        super().__init__(name, config={"logger": logger, **identity})
         self.overclocked = True
         self.charge = 0
 
@@ -49,22 +52,22 @@ class Mechanist(Entity):
             if self.cooldowns[skill] > 0:
                 self.cooldowns[skill] -= 1
 
-        self.recover_stamina(random.uniform(7, 12))
+        self.recover_stamina(self.rng.uniform(7, 12))
 
     def emp_pulse(self, opponent):
         opponent.mana = max(0, opponent.mana - 20)
-        self.logger(f"{self.name} emits an EMP pulse, disabling {opponent.name}'s magic channels!")
+        self.log("emp_pulse", opponent.name)
 
     def overdrive(self, opponent):
         damage = 40 + self.heat * 0.2
         self.heat = 0
         actual = opponent.take_damage(damage)
-        self.logger(f"{self.name} activates Overdrive! Unleashes {actual:.1f} damage using excess heat.")
+        self.log("overdrive", opponent.name, actual)
 
     def heal(self):
         # Converts healing attempts into stamina
         self.recover_stamina(20)
-        self.logger(f"{self.name} reroutes divine healing into mechanical stamina recovery.")
+        self.log("reroute_healing")
 
     def use_health_potion(self):
         # Same as base but logs differently
@@ -72,9 +75,9 @@ class Mechanist(Entity):
             healed = min(30, self.max_health - self.health)
             self.health += healed
             self.inventory["health_potion"] -= 1
-            self.logger(f"{self.name} applies a nano-repair gel and restores {healed} HP.")
+            self.log("repair_gel", None, healed)
         else:
-            self.logger(f"{self.name} has no repair gels available.")
+            self.log("no_repair_gel")
 
     def reset_modifiers(self):
         super().reset_modifiers()
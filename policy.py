@@ -0,0 +1,120 @@
+# policy.py
+# Precomputed action sampling for Entity.choose_action / choose_attack.
+#
+# Which actions are on the table only depends on a few resource gates:
+#   low health   health below 40% of max        (heal)
+#   stamina band <5, 5-10, 10-20, 20+           (rest, quick, normal, heavy)
+#   can cast     mana >= mana_cost              (magic)
+# so there are just 16 possible option lists. A Policy builds a Walker
+# alias table for each of them once; sampling is then one uniform draw, an
+# index and a compare, with nothing allocated. sample_batch draws for a
+# whole population in a few NumPy operations (numpy is imported on first
+# use, so plain battles never load it).
+
+from functools import lru_cache
+
+# Action codes, in Entity.choose_action order (array_engine shares them)
+ACTIONS = ("heal", "rest", "heavy_attack", "magic_attack", "quick_attack", "normal_attack", "defend")
+ACTION_CODES = {name: code for code, name in enumerate(ACTIONS)}
+
+ACTION_WEIGHTS = {
+    "heal": 0.6, "rest": 0.8, "heavy_attack": 0.3,
+    "magic_attack": 0.3, "quick_attack": 0.3, "normal_attack": 0.4,
+}
+ATTACK_WEIGHTS = {"heavy_attack": 0.3, "magic_attack": 0.3, "quick_attack": 0.3, "normal_attack": 0.4}
+
+GATE_KEYS = 16
+
+
+def gate_key(low_health, stamina, can_cast):
+    band = (stamina >= 5) + (stamina >= 10) + (stamina >= 20)
+    return (low_health << 3) | (band << 1) | can_cast
+
+
+def is_open(action, key):
+    low_health, band, can_cast = key >> 3, (key >> 1) & 3, key & 1
+    return {
+        "heal": low_health,
+        "rest": band <= 1,
+        "heavy_attack": band == 3,
+        "magic_attack": can_cast,
+        "quick_attack": band >= 1,
+        "normal_attack": band >= 2,
+    }.get(action, True)
+
+
+def alias_table(weights):
+    """Vose's alias method: (probability, alias index) per column."""
+    n = len(weights)
+    total = sum(weights)
+    scaled = [w * n / total for w in weights]
+    prob = [1.0] * n
+    alias = list(range(n))
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+    while small and large:
+        s, l = small.pop(), large.pop()
+        prob[s], alias[s] = scaled[s], l
+        scaled[l] -= 1.0 - scaled[s]
+        (small if scaled[l] < 1.0 else large).append(l)
+    return prob, alias
+
+
+class Policy:
+    """Weighted choice over the gated actions in `weights`; `fallback` when none is open."""
+
+    def __init__(self, weights, fallback):
+        self.weights = dict(weights)
+        self.fallback = fallback
+        # Per gate key: (column count, ((probability, action, alias action), ...))
+        self.tables = []
+        for key in range(GATE_KEYS):
+            options = [(action, w) for action, w in self.weights.items() if is_open(action, key)] or [(fallback, 1.0)]
+            prob, alias = alias_table([w for _, w in options])
+            self.tables.append((len(options), tuple(
+                (prob[i], options[i][0], options[alias[i]][0]) for i in range(len(options))
+            )))
+        self._arrays = None
+
+    def sample(self, low_health, stamina, can_cast, u):
+        """One action for the given gates; `u` is a uniform draw in [0, 1)."""
+        n, columns = self.tables[gate_key(low_health, stamina, can_cast)]
+        x = u * n
+        i = int(x)
+        p, action, alias = columns[i]
+        return action if x - i < p else alias
+
+    def arrays(self):
+        """The tables as (counts, probability, action code, alias code) arrays indexed by [gate key, column]."""
+        if self._arrays is None:
+            import numpy as np
+            width = max(n for n, _ in self.tables)
+            counts = np.array([n for n, _ in self.tables], dtype=np.float64)
+            prob = np.ones((GATE_KEYS, width))
+            code = np.zeros((GATE_KEYS, width), dtype=np.intp)
+            alias = np.zeros((GATE_KEYS, width), dtype=np.intp)
+            for key, (_, columns) in enumerate(self.tables):
+                for i, (p, action, other) in enumerate(columns):
+                    prob[key, i], code[key, i], alias[key, i] = p, ACTION_CODES[action], ACTION_CODES[other]
+            self._arrays = (counts, prob, code, alias)
+        return self._arrays
+
+    def sample_batch(self, low_health, stamina, can_cast, rng):
+        """Action codes (see ACTIONS) for a population, given gate arrays and a numpy Generator."""
+        import numpy as np
+        counts, prob, code, alias = self.arrays()
+        band = (stamina >= 5).astype(np.intp) + (stamina >= 10) + (stamina >= 20)
+        key = (low_health.astype(np.intp) << 3) | (band << 1) | can_cast.astype(np.intp)
+        x = rng.random(key.size) * counts[key]
+        i = x.astype(np.intp)
+        return np.where(x - i < prob[key, i], code[key, i], alias[key, i])
+
+
+@lru_cache(maxsize=None)
+def _cached_policy(weights, fallback):
+    return Policy(weights, fallback)
+
+
+def policy_for(weights, fallback):
+    """Shared Policy for a weights mapping, built once per distinct weights/fallback."""
+    return _cached_policy(tuple(weights.items()), fallback)
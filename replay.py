@@ -0,0 +1,302 @@
+# replay.py
+# Compact binary battle replays.
+#
+# A replay is a header (actor names, cosmic event names) followed by
+# fixed-size records:
+#   ACTION    turn, actor id, action code, target id and the deltas it caused
+#             (target health/mana, actor health/mana/stamina/karma)
+#   SNAPSHOT  health, mana, stamina and karma of every entity at the end of a turn
+# and a footer indexing where each turn starts and where its snapshot is,
+# so a reader can jump straight to turn N without re-simulating anything.
+#
+# Usage:
+#   battlefield.run_battle(seed=3, replay="battle.cwr")
+#   r = ReplayReader("battle.cwr")
+#   r.snapshot(20)       # state of every entity after turn 20
+#   r.actions(20)        # what happened during turn 20
+
+import argparse
+import struct
+from collections import namedtuple
+
+MAGIC = b"CWRP"
+INDEX_MAGIC = b"CWIX"
+VERSION = 1
+
+ACTION, SNAPSHOT = 1, 2
+HEADER = struct.Struct("<4sBHH")
+NAME_LEN = struct.Struct("<H")
+KIND = struct.Struct("<B")
+ACTION_RECORD = struct.Struct("<IHBH6f")
+TURN = struct.Struct("<I")
+STATE = struct.Struct("<4f")
+INDEX_ENTRY = struct.Struct("<IQQ")
+FOOTER = struct.Struct("<QI4s")
+
+NO_TARGET = 0xFFFF
+COSMOS = 0xFFFE
+
+ACTIONS = (
+    "none", "normal_attack", "heavy_attack", "quick_attack", "magic_attack",
+    "heal", "rest", "defend", "health_potion", "mana_potion", "stamina_boost",
+    "pray", "emp_pulse", "overdrive", "idle", "divine_heal", "divine_mana", "divine_decay", "cosmic_event",
+)
+ACTION_CODES = {name: code for code, name in enumerate(ACTIONS)}
+
+# Combat log event -> replay action
+EVENT_ACTIONS = {
+    "rest": "rest",
+    "heal": "heal",
+    "reroute_healing": "heal",
+    "defend": "defend",
+    "health_potion": "health_potion",
+    "repair_gel": "health_potion",
+    "mana_potion": "mana_potion",
+    "stamina_boost": "stamina_boost",
+    "priest_brahma": "pray",
+    "priest_vishnu": "pray",
+    "priest_shiva": "pray",
+    "priest_unanswered": "pray",
+    "priest_no_mana": "pray",
+    "emp_pulse": "emp_pulse",
+    "overdrive": "overdrive",
+    "intern_forgot": "idle",
+    "god_heal": "divine_heal",
+    "god_mana": "divine_mana",
+    "god_decay": "divine_decay",
+}
+ATTACK_ACTIONS = {
+    "Normal Attack": "normal_attack",
+    "Heavy Attack": "heavy_attack",
+    "Quick Attack": "quick_attack",
+    "Magic Attack": "magic_attack",
+}
+
+Action = namedtuple("Action", "turn actor action target target_health target_mana health mana stamina karma")
+EntityState = namedtuple("EntityState", "name health mana stamina karma")
+
+
+def entity_state(entity):
+    return (entity.health, entity.mana, entity.stamina, entity.karma)
+
+
+class ReplayRecorder:
+    """Writes a replay for one Battle.
+
+    The recorder listens on the battle's shared CombatLog to learn which
+    action each actor took, and diffs entity state around every action to
+    record what it changed.
+    """
+
+    def __init__(self, path, entities, gods, cosmic):
+        self.file = open(path, "wb")
+        self.entities = list(entities)
+        self.gods = list(gods.values())
+        # Actors are told apart by identity, so namesakes keep their own ids;
+        # log events only carry names, which are resolved against the
+        # combatants the action can touch (see begin)
+        self.ids = {actor: i for i, actor in enumerate(self.entities + self.gods)}
+        self.event_ids = {event.name: i for i, event in enumerate(cosmic.events)}
+        self.index = []
+        self.turn = 0
+        self._actor = None
+
+        names = [e.name for e in self.entities] + [god.name for god in self.gods]
+        self.file.write(HEADER.pack(MAGIC, VERSION, len(self.entities), len(names)))
+        for name in names + [event.name for event in cosmic.events]:
+            self._write_name(name)
+        self.file.write(NAME_LEN.pack(0xFFFF))
+        self.start_turn(0)
+        self.end_turn()
+
+    def _write_name(self, name):
+        data = name.encode("utf-8")
+        self.file.write(NAME_LEN.pack(len(data)) + data)
+
+    def attach(self, log):
+        log.add_handler(self.on_event)
+
+    def on_event(self, turn, level, code, args):
+        if code == "cosmic_event":
+            self._write_action(COSMOS, "cosmic_event", self.event_ids.get(args[0], NO_TARGET), (0.0,) * 6)
+            return
+        actor = self._actor
+        if actor is None or actor["action"] is not None or args[0] != actor["name"]:
+            return
+        if code in ("attack_hit", "attack_missed"):
+            actor["action"] = ATTACK_ACTIONS.get(args[3], "none")
+        elif code in EVENT_ACTIONS:
+            actor["action"] = EVENT_ACTIONS[code]
+        else:
+            return
+        if len(args) > 1 and args[1] is not None:
+            target = actor["known"].get(args[1])
+            if target is not None:
+                actor["target"] = target
+
+    def start_turn(self, turn):
+        self.turn = turn
+        self._turn_offset = self.file.tell()
+
+    def begin(self, actor, target=None, others=()):
+        """Start recording `actor`'s action; `others` are combatants it may act on besides `target`.
+
+        Only the actor, `target` and `others` can change during the action,
+        so only their state is kept to diff against in end().
+        """
+        actor_id = self.ids[actor]
+        known = {}
+        before = {}
+        involved = (*others, target, actor) if actor_id < len(self.entities) else (*others, target)
+        for other in involved:
+            if other is not None:
+                i = self.ids[other]
+                known[other.name] = i if known.get(other.name, i) == i else None  # namesakes: ambiguous
+                before[i] = entity_state(other)
+        self._actor = {
+            "id": actor_id,
+            "name": actor.name,
+            "known": known,
+            "target": self.ids[target] if target is not None else NO_TARGET,
+            "action": None,
+            "before": before,
+        }
+
+    def end(self):
+        actor, self._actor = self._actor, None
+        is_god = actor["id"] >= len(self.entities)
+        if is_god and actor["action"] is None:
+            return
+        before = actor["before"]
+        deltas = [0.0] * 6
+        if actor["target"] < len(self.entities):
+            target = actor["target"]
+            now = entity_state(self.entities[target])
+            deltas[0] = now[0] - before[target][0]
+            deltas[1] = now[1] - before[target][1]
+        if not is_god:
+            now = entity_state(self.entities[actor["id"]])
+            deltas[2:] = [after - was for after, was in zip(now, before[actor["id"]])]
+        self._write_action(actor["id"], actor["action"] or "none", actor["target"], deltas)
+
+    def _write_action(self, actor_id, action, target_id, deltas):
+        self.file.write(KIND.pack(ACTION) + ACTION_RECORD.pack(self.turn, actor_id, ACTION_CODES[action], target_id, *deltas))
+
+    def end_turn(self):
+        snapshot_offset = self.file.tell()
+        self.file.write(KIND.pack(SNAPSHOT) + TURN.pack(self.turn))
+        for e in self.entities:
+            self.file.write(STATE.pack(*entity_state(e)))
+        self.index.append((self.turn, self._turn_offset, snapshot_offset))
+
+    def close(self):
+        if self.file.closed:
+            return
+        index_offset = self.file.tell()
+        for entry in self.index:
+            self.file.write(INDEX_ENTRY.pack(*entry))
+        self.file.write(FOOTER.pack(index_offset, len(self.index), INDEX_MAGIC))
+        self.file.close()
+
+
+class ReplayReader:
+    """Random access to a replay written by ReplayRecorder."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = f.read()
+        magic, version, entity_count, actor_count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} battle replay")
+        offset = HEADER.size
+        names = []
+        while True:
+            (length,) = NAME_LEN.unpack_from(self.data, offset)
+            offset += NAME_LEN.size
+            if length == 0xFFFF:
+                break
+            names.append(self.data[offset:offset + length].decode("utf-8"))
+            offset += length
+        self.entity_count = entity_count
+        self.names = names[:entity_count]
+        self.actor_names = names[:actor_count]
+        self.event_names = names[actor_count:]
+        self.snapshot_size = TURN.size + STATE.size * entity_count
+        self._body = offset
+        self.index = self._read_index() or self._scan()
+
+    def _read_index(self):
+        if len(self.data) < FOOTER.size:
+            return None
+        index_offset, count, magic = FOOTER.unpack_from(self.data, len(self.data) - FOOTER.size)
+        if magic != INDEX_MAGIC:
+            return None
+        self._end = index_offset
+        return {turn: (start, snapshot) for turn, start, snapshot in INDEX_ENTRY.iter_unpack(
+            self.data[index_offset:index_offset + count * INDEX_ENTRY.size])}
+
+    def _scan(self):
+        # No footer (the battle was not closed cleanly): rebuild the index in one pass
+        index = {}
+        offset = start = self._body
+        end = len(self.data)
+        while offset + KIND.size <= end:
+            (kind,) = KIND.unpack_from(self.data, offset)
+            if kind == ACTION:
+                offset += KIND.size + ACTION_RECORD.size
+            elif kind == SNAPSHOT and offset + KIND.size + self.snapshot_size <= end:
+                (turn,) = TURN.unpack_from(self.data, offset + KIND.size)
+                index[turn] = (start, offset)
+                offset += KIND.size + self.snapshot_size
+                start = offset
+            else:
+                break
+        self._end = offset
+        return index
+
+    @property
+    def turns(self):
+        return max(self.index) if self.index else 0
+
+    def snapshot(self, turn):
+        """State of every entity at the end of `turn` (turn 0 is the starting state)."""
+        offset = self.index[turn][1] + KIND.size + TURN.size
+        return [
+            EntityState(name, *STATE.unpack_from(self.data, offset + i * STATE.size))
+            for i, name in enumerate(self.names)
+        ]
+
+    def actions(self, turn):
+        start, stop = self.index[turn]
+        return [
+            Action._make(ACTION_RECORD.unpack_from(self.data, offset + KIND.size))
+            for offset in range(start, stop, KIND.size + ACTION_RECORD.size)
+        ]
+
+    def frames(self, start=0):
+        """Yield (turn, actions, snapshot) from `start` to the end of the battle."""
+        for turn in range(start, self.turns + 1):
+            yield turn, self.actions(turn), self.snapshot(turn)
+
+    def describe(self, action):
+        if action.actor == COSMOS:
+            return f"Cosmos: {self.event_names[action.target]}"
+        actor = self.actor_names[action.actor]
+        target = self.actor_names[action.target] if action.target < len(self.actor_names) else "-"
+        return (f"{actor} {ACTIONS[action.action]} -> {target}: target HP {action.target_health:+.1f}, "
+                f"target mana {action.target_mana:+.1f}, "
+                f"HP {action.health:+.1f}, mana {action.mana:+.1f}, stamina {action.stamina:+.1f}, karma {action.karma:+.0f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect a battle replay")
+    parser.add_argument("path")
+    parser.add_argument("--turn", type=int, help="jump to this turn (default: last)")
+    args = parser.parse_args()
+
+    reader = ReplayReader(args.path)
+    turn = reader.turns if args.turn is None else args.turn
+    print(f"{len(reader.names)} combatants, {reader.turns} turns")
+    for action in reader.actions(turn):
+        print("  " + reader.describe(action))
+    for state in reader.snapshot(turn):
+        print(f"  {state.name:<20} HP {state.health:7.1f}  Mana {state.mana:6.1f}  Stamina {state.stamina:6.1f}  Karma {state.karma:5.0f}")
@@ -0,0 +1,14 @@
+# rng.py
+# Independent, reproducible random streams. Every stream is a
+# random.Random seeded from a master seed plus a path such as
+# ("battle", 12, "entity", 3), so a battle replays bit-identically no
+# matter which thread or process runs it, or in what order.
+
+import random
+
+def derive_seed(master_seed, *path):
+    # str seeds are hashed with sha512, so this is stable across processes and runs
+    return random.Random(":".join(str(part) for part in (master_seed, *path))).getrandbits(63)
+
+def stream(master_seed, *path):
+    return random.Random(derive_seed(master_seed, *path))
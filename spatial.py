@@ -0,0 +1,142 @@
+# spatial.py
+# Optional 2-D battlefield: positions plus a uniform-grid neighbour index.
+#
+# Combatants are bucketed into square cells of `cell_size`. Picking a
+# target searches rings of cells outward from the attacker's cell and
+# stops at the first ring that holds a living opponent, so on a map with
+# roughly even density a lookup touches a constant number of cells no
+# matter how many combatants there are. Dead combatants are dropped from
+# the index the first time a search runs into them; the gods can revive
+# them, so they keep their spot and rejoin the index on their next turn.
+#
+# Usage:
+#   grid = SpatialGrid.scatter(entities, rng=random.Random(1))
+#   battle = Battle(entities, gods, grid=grid)
+
+import math
+import random
+
+
+class SpatialGrid:
+    def __init__(self, width, height, cell_size=10.0):
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.columns = max(1, math.ceil(width / cell_size))
+        self.rows = max(1, math.ceil(height / cell_size))
+        self.cells = {}
+        self.positions = {}
+        self.fallen = {}
+
+    @classmethod
+    def scatter(cls, entities, rng=random, density=1.0, cell_size=10.0):
+        """Place `entities` uniformly at random on a square map holding about
+        `density` combatants per cell."""
+        entities = list(entities)
+        side = cell_size * max(1.0, math.sqrt(len(entities) / density))
+        grid = cls(side, side, cell_size)
+        for e in entities:
+            grid.place(e, rng.uniform(0, side), rng.uniform(0, side))
+        return grid
+
+    def _cell(self, x, y):
+        return (min(int(x // self.cell_size), self.columns - 1), min(int(y // self.cell_size), self.rows - 1))
+
+    def place(self, entity, x, y):
+        x = min(max(x, 0.0), self.width)
+        y = min(max(y, 0.0), self.height)
+        cell = self._cell(x, y)
+        self.positions[entity] = (x, y, cell)
+        self.cells.setdefault(cell, []).append(entity)
+
+    def remove(self, entity):
+        self.fallen.pop(entity, None)
+        if entity in self.positions:
+            self._evict(entity)
+
+    def _evict(self, entity):
+        x, y, cell = self.positions.pop(entity)
+        members = self.cells[cell]
+        members.remove(entity)
+        if not members:
+            del self.cells[cell]
+
+    def move(self, entity, x, y):
+        self.remove(entity)
+        self.place(entity, x, y)
+
+    def position(self, entity):
+        x, y, _ = self.positions.get(entity) or self.fallen[entity]
+        return x, y
+
+    def _locate(self, entity):
+        # Cell of `entity`, putting it back in the index if it fell and was revived
+        if entity not in self.positions:
+            x, y, _ = self.fallen.pop(entity)
+            self.place(entity, x, y)
+        return self.positions[entity][2]
+
+    def __contains__(self, entity):
+        return entity in self.positions or entity in self.fallen
+
+    def __len__(self):
+        return len(self.positions) + len(self.fallen)
+
+    def _ring(self, cx, cy, r):
+        # Cells at Chebyshev distance exactly r from (cx, cy), clipped to the map
+        if r == 0:
+            yield cx, cy
+            return
+        for x in range(max(cx - r, 0), min(cx + r, self.columns - 1) + 1):
+            if cy - r >= 0:
+                yield x, cy - r
+            if cy + r < self.rows:
+                yield x, cy + r
+        for y in range(max(cy - r + 1, 0), min(cy + r - 1, self.rows - 1) + 1):
+            if cx - r >= 0:
+                yield cx - r, y
+            if cx + r < self.columns:
+                yield cx + r, y
+
+    def _living(self, cell, exclude, accept):
+        members = self.cells.get(cell)
+        if not members:
+            return []
+        found = []
+        for e in members[:]:
+            if not e.is_alive():
+                self.fallen[e] = self.positions[e]
+                self._evict(e)
+            elif e is not exclude and (accept is None or accept(e)):
+                found.append(e)
+        return found
+
+    def nearby(self, entity, accept=None):
+        """Living combatants (other than `entity`, passing `accept`) in the closest ring of cells that has any."""
+        cx, cy = self._locate(entity)
+        for r in range(max(self.columns, self.rows)):
+            found = []
+            for cell in self._ring(cx, cy, r):
+                found.extend(self._living(cell, entity, accept))
+            if found:
+                return found
+        return []
+
+    def within(self, entity, radius, accept=None):
+        """Living combatants within `radius` map units of `entity`."""
+        cx, cy = self._locate(entity)
+        x, y, _ = self.positions[entity]
+        reach = math.ceil(radius / self.cell_size)
+        found = []
+        for r in range(reach + 1):
+            for cell in self._ring(cx, cy, r):
+                for e in self._living(cell, entity, accept):
+                    ex, ey, _ = self.positions[e]
+                    if (ex - x) ** 2 + (ey - y) ** 2 <= radius * radius:
+                        found.append(e)
+        return found
+
+    def pick_target(self, entity, rng=random, accept=None):
+        """A random living opponent from the nearest occupied ring, or None."""
+        candidates = self.nearby(entity, accept)
+        return rng.choice(candidates) if candidates else None
@@ -0,0 +1,101 @@
+# tournament.py
+# Monte Carlo tournament: shards independent headless battles across a
+# process pool and aggregates win rates, turns-to-victory and divine
+# interventions. Every battle gets a seed derived from the master seed and
+# its index, so results are identical for any worker count or shard size.
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from battlefield import ROSTERS, run_battle
+from rng import derive_seed
+
+@dataclass
+class TournamentResult:
+    battles: int = 0
+    stalemates: int = 0
+    victory_turns: int = 0
+    wins: dict[str, int] = field(default_factory=dict)
+    interventions: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def victories(self):
+        return self.battles - self.stalemates
+
+    @property
+    def win_rates(self):
+        return {name: count / self.battles for name, count in self.wins.items()} if self.battles else {}
+
+    @property
+    def mean_turns_to_victory(self):
+        return self.victory_turns / self.victories if self.victories else 0.0
+
+    def add(self, result):
+        self.battles += 1
+        if result.stalemate:
+            self.stalemates += 1
+        else:
+            self.victory_turns += result.turns
+            self.wins[result.winner] = self.wins.get(result.winner, 0) + 1
+        for god, count in result.interventions.items():
+            self.interventions[god] = self.interventions.get(god, 0) + count
+
+    def merge(self, other):
+        self.battles += other.battles
+        self.stalemates += other.stalemates
+        self.victory_turns += other.victory_turns
+        for name, count in other.wins.items():
+            self.wins[name] = self.wins.get(name, 0) + count
+        for god, count in other.interventions.items():
+            self.interventions[god] = self.interventions.get(god, 0) + count
+
+
+def run_shard(roster, max_turns, master_seed, start, stop):
+    shard = TournamentResult()
+    for index in range(start, stop):
+        shard.add(run_battle(roster, max_turns, derive_seed(master_seed, index)))
+    return shard
+
+def run_tournament(battles, roster="classic", max_turns=50, master_seed=0, workers=None, shard_size=None):
+    """Run `battles` independent battles across a process pool.
+
+    `roster` must be a key of ROSTERS so shards can be pickled to workers.
+    """
+    workers = workers or os.cpu_count() or 1
+    shard_size = shard_size or max(1, -(-battles // (workers * 4)))
+    total = TournamentResult()
+    if workers == 1:
+        total.merge(run_shard(roster, max_turns, master_seed, 0, battles))
+        return total
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(run_shard, roster, max_turns, master_seed, start, min(start + shard_size, battles))
+            for start in range(0, battles, shard_size)
+        ]
+        for future in futures:
+            total.merge(future.result())
+    return total
+
+def print_report(result, elapsed):
+    print(f"{result.battles} battles in {elapsed:.2f}s ({result.battles / elapsed:.0f} battles/s)")
+    print(f"Mean turns to victory: {result.mean_turns_to_victory:.2f}")
+    for name, rate in sorted(result.win_rates.items(), key=lambda x: x[1], reverse=True):
+        print(f"{name:<20} {rate:7.2%}")
+    print(f"{'Stalemate':<20} {result.stalemates / result.battles:7.2%}")
+    print("Divine interventions: " + ", ".join(f"{god}: {count}" for god, count in sorted(result.interventions.items())))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo battle tournament")
+    parser.add_argument("-n", "--battles", type=int, default=10000)
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--roster", choices=sorted(ROSTERS), default="classic")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = run_tournament(args.battles, args.roster, args.turns, args.seed, args.workers)
+    print_report(result, time.perf_counter() - start)
@@ -1,42 +1,97 @@
 import customtkinter as ctk
 import tkinter as tk
-from tkinter import messagebox
-import random
-import time
+from tkinter import messagebox, ttk
+import queue
+from functools import partial
 from entity import Entity
 from priest import Priest
 from intern import Intern
 from mechanist import Mechanist
 from gods import get_all_gods
 from cosmic_event import CosmicEvent
+from battlefield import Battle, royale_roster
+from battle_thread import BattleThread
+from combat_log import CombatLog
 
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
 
+FRAME_MS = 1000 // 30  # the GUI renders the latest battle snapshot at 30 FPS
+LOG_MAX_LINES = 2000   # older lines are trimmed from the log box
+SPEEDS = (1, 2, 5, 10, 25, 100, 500, None)  # turns per second; None is as fast as possible
+MAX_TURNS = ("50", "200", "1000", "10000")
+
+def gui_roster(gods, logger):
+    return [
+        Priest("Guru Vyas", gods=gods, logger=logger),
+        Entity("Entity2", logger=logger),
+        Mechanist("Arthur 2.0", logger=logger),
+        Intern("Intern Greg", logger=logger),
+    ]
+
+ROSTER_CHOICES = {
+    "Classic": gui_roster,
+    "Royale (100)": partial(royale_roster, size=100),
+    "Royale (500)": partial(royale_roster, size=500),
+}
+
+# Roster table: heading, width, and the sort key for the column
+COLUMNS = {
+    "name": ("Name", 180, lambda e: e.name),
+    "class": ("Class", 100, lambda e: e.kind),
+    "faction": ("Faction", 100, lambda e: e.faction),
+    "health": ("HP", 120, lambda e: e.health),
+    "mana": ("Mana", 120, lambda e: e.mana),
+    "stamina": ("Stamina", 120, lambda e: e.stamina),
+    "karma": ("Karma", 80, lambda e: e.karma),
+    "status": ("Status", 80, lambda e: e.alive),
+}
+
+def row_values(e):
+    return (
+        e.name, e.kind, e.faction,
+        f"{e.health:.1f}/{e.max_health}", f"{e.mana:.1f}/{e.max_mana}",
+        f"{e.stamina:.1f}/{e.max_stamina}", e.karma, "Alive" if e.alive else "Fallen",
+    )
+
+def row_tag(e):
+    if not e.alive:
+        return "fallen"
+    return "low" if e.health < 0.3 * e.max_health else "ok"
+
 class WarGUI(ctk.CTk):
+    """Live view of a battle that runs on a BattleThread.
+
+    The simulation never runs on the Tk thread: controls only signal the
+    worker, and poll() picks up the latest snapshot and the queued log
+    lines once per frame.
+    """
+
     def __init__(self):
         super().__init__()
         self.title("Cosmic War Simulator")
         self.geometry("1200x850")
         self.resizable(True, True)
 
-        self.gods = get_all_gods()
-        self.cosmic = CosmicEvent()
-
-        self.turn = 0
         self.max_turns = 50
-        self.running = False
-
-        self.entity1 = Priest("Guru Vyas", gods=self.gods, logger=self.log)
-        self.entity2 = Entity("Entity2", logger=self.log)
-        self.entity3 = Mechanist("Arthur 2.0", logger=self.log)
-        self.entity4 = Intern("Intern Greg", logger=self.log)
-
-        self.entities = [self.entity1, self.entity2, self.entity3, self.entity4]
+        self.speed = 1
+        self.roster_factory = gui_roster
+        self.rows = []          # what each roster row shows, by entity index
+        self.row_order = []
+        self.sort_column = None
+        self.sort_reverse = False
+        self.last_snapshot = None
+        self.runner = None
+        self.announced = False
+        self.log_queue = queue.Queue()
+        self.log_pending = []
+        self.log_lines = 0
+        self.log_turn = 0
 
         self.build_ui()
-        self.update_stats()
+        self.new_battle()
         self.log("Welcome to the Cosmic War Simulator!")
+        self.after(FRAME_MS, self.poll)
 
     def build_ui(self):
         self.grid_columnconfigure((0, 1), weight=1)
@@ -48,14 +103,7 @@ class WarGUI(ctk.CTk):
         self.cosmic_label = ctk.CTkLabel(self, text="Cosmic Event: None", font=("Arial", 14))
         self.cosmic_label.grid(row=1, column=0, columnspan=2, pady=5)
 
-        self.status_frame = ctk.CTkScrollableFrame(self, width=1150, height=250)
-        self.status_frame.grid(row=2, column=0, columnspan=2, padx=10, pady=10, sticky="nsew")
-
-        self.status_widgets = []
-        for i, entity in enumerate(self.entities):
-            frame = self.create_status_frame(self.status_frame, entity)
-            frame.grid(row=i//2, column=i%2, padx=10, pady=10, sticky="nsew")
-            self.status_widgets.append(frame)
+        self.build_roster_view()
 
         self.log_box = ctk.CTkTextbox(self, width=1100, height=300)
         self.log_box.grid(row=3, column=0, columnspan=2, padx=10, pady=10)
@@ -63,6 +111,9 @@ class WarGUI(ctk.CTk):
         self.controls = ctk.CTkFrame(self)
         self.controls.grid(row=4, column=0, columnspan=2, pady=10)
 
+        self.turn_label = ctk.CTkLabel(self.controls, text="Turn 0", width=110)
+        self.turn_label.pack(side="left", padx=10)
+
         self.next_btn = ctk.CTkButton(self.controls, text="Next Turn", command=self.next_turn)
         self.next_btn.pack(side="left", padx=10)
 
@@ -72,123 +123,192 @@ class WarGUI(ctk.CTk):
         self.reset_btn = ctk.CTkButton(self.controls, text="Reset", command=self.reset)
         self.reset_btn.pack(side="left", padx=10)
 
-    def create_status_frame(self, parent, entity):
-        frame = ctk.CTkFrame(parent)
-        color_map = {
-            "Priest": "#88e0ff",
-            "Mechanist": "#ffa07a",
-            "Intern": "#dddddd"
-        }
-        class_name = entity.__class__.__name__
-        border_color = color_map.get(class_name, "#bbbbbb")
-
-        frame.configure(border_color=border_color, border_width=2)
-
-        entity.name_label = ctk.CTkLabel(frame, text=entity.name, font=("Arial", 18, "bold"))
-        entity.name_label.pack(pady=5)
-
-        entity.health_bar = ctk.CTkProgressBar(frame)
-        entity.health_bar.set(entity.health / entity.max_health)
-        entity.health_bar.pack(fill="x", padx=10)
-        entity.health_text = ctk.CTkLabel(frame, text=f"❤️ Health: {entity.health:.1f}/{entity.max_health}")
-        entity.health_text.pack()
-
-        entity.mana_text = ctk.CTkLabel(frame, text=f"🔋 Mana: {entity.mana:.1f}/{entity.max_mana}")
-        entity.mana_text.pack()
-
-        entity.stamina_text = ctk.CTkLabel(frame, text=f"⚡ Stamina: {entity.stamina:.1f}/{entity.max_stamina}")
-        entity.stamina_text.pack()
-
-        return frame
-
-    def log(self, text):
-        self.log_box.insert("end", text + "\n")
-        self.log_box.see("end")
-
-    def update_stats(self):
-        for entity in self.entities:
-            if hasattr(entity, 'health_bar'):
-                entity.health_bar.set(entity.health / entity.max_health)
-                entity.health_text.configure(text=f"❤️ Health: {entity.health:.1f}/{entity.max_health}")
-                entity.mana_text.configure(text=f"🔋 Mana: {entity.mana:.1f}/{entity.max_mana}")
-                entity.stamina_text.configure(text=f"⚡ Stamina: {entity.stamina:.1f}/{entity.max_stamina}")
+        self.speed_label = ctk.CTkLabel(self.controls, text="", width=110)
+        self.speed_label.pack(side="left", padx=(20, 5))
+        self.speed_slider = ctk.CTkSlider(self.controls, from_=0, to=len(SPEEDS) - 1,
+                                          number_of_steps=len(SPEEDS) - 1, command=self.set_speed)
+        self.speed_slider.set(0)
+        self.speed_slider.pack(side="left", padx=5)
+        self.set_speed(0)
+
+        ctk.CTkLabel(self.controls, text="Roster").pack(side="left", padx=(20, 5))
+        self.roster_menu = ctk.CTkOptionMenu(self.controls, values=list(ROSTER_CHOICES), width=120, command=self.set_roster)
+        self.roster_menu.pack(side="left", padx=5)
+
+        ctk.CTkLabel(self.controls, text="Max turns").pack(side="left", padx=(20, 5))
+        self.turns_menu = ctk.CTkOptionMenu(self.controls, values=list(MAX_TURNS), width=90, command=self.set_max_turns)
+        self.turns_menu.set(str(self.max_turns))
+        self.turns_menu.pack(side="left", padx=5)
+
+    def build_roster_view(self):
+        # One Treeview for the whole roster: Tk only draws the visible rows,
+        # so hundreds of combatants cost no more widgets than four
+        frame = ctk.CTkFrame(self)
+        frame.grid(row=2, column=0, columnspan=2, padx=10, pady=10, sticky="nsew")
+        frame.grid_columnconfigure(0, weight=1)
+        frame.grid_rowconfigure(0, weight=1)
+
+        style = ttk.Style(self)
+        style.theme_use("default")
+        style.configure("Roster.Treeview", background="#2b2b2b", fieldbackground="#2b2b2b",
+                        foreground="#dddddd", rowheight=24, borderwidth=0)
+        style.configure("Roster.Treeview.Heading", background="#1f538d", foreground="#ffffff")
+
+        self.roster = ttk.Treeview(frame, columns=list(COLUMNS), show="headings", style="Roster.Treeview", height=10)
+        for column, (heading, width, _) in COLUMNS.items():
+            self.roster.heading(column, text=heading, command=partial(self.sort_by, column))
+            self.roster.column(column, width=width, anchor="w" if column in ("name", "class", "faction") else "e")
+        self.roster.tag_configure("low", foreground="#ff6b6b")
+        self.roster.tag_configure("fallen", foreground="#777777")
+        self.roster.grid(row=0, column=0, sticky="nsew")
+
+        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self.roster.yview)
+        scrollbar.grid(row=0, column=1, sticky="ns")
+        self.roster.configure(yscrollcommand=scrollbar.set)
+
+    def sort_by(self, column):
+        if self.sort_column == column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column, self.sort_reverse = column, column in ("health", "mana", "stamina", "karma")
+        for name, (heading, _, _) in COLUMNS.items():
+            arrow = (" ▼" if self.sort_reverse else " ▲") if name == column else ""
+            self.roster.heading(name, text=heading + arrow)
+        if self.last_snapshot:
+            self.update_roster(self.last_snapshot.entities)
+
+    def update_roster(self, entities):
+        tree = self.roster
+        if len(entities) != len(self.rows) or any(row[0] != e.name for row, e in zip(self.rows, entities)):
+            tree.delete(*tree.get_children())
+            self.rows = [None] * len(entities)
+            self.row_order = list(range(len(entities)))
+            for i in self.row_order:
+                tree.insert("", "end", iid=str(i))
+
+        # Touch a row only when what it displays has changed
+        for i, e in enumerate(entities):
+            values = row_values(e)
+            if self.rows[i] != values:
+                self.rows[i] = values
+                tree.item(str(i), values=values, tags=(row_tag(e),))
+
+        if self.sort_column:
+            key = COLUMNS[self.sort_column][2]
+            order = sorted(range(len(entities)), key=lambda i: key(entities[i]), reverse=self.sort_reverse)
+            if order != self.row_order:
+                self.row_order = order
+                for position, i in enumerate(order):
+                    tree.move(str(i), "", position)
+
+    # -----------------------------------------------------
+    # Battle control (the battle itself runs on self.runner)
+    # -----------------------------------------------------
+    def new_battle(self):
+        if self.runner:
+            self.runner.stop()
+        self.log_queue = log_queue = queue.Queue()
+        log = CombatLog(lambda text: log_queue.put((log.turn, text)))
+        gods = get_all_gods(logger=log)
+        entities = self.roster_factory(gods, log)
+        battle = Battle(entities, gods, CosmicEvent(logger=log), max_turns=self.max_turns, log=log)
+        self.runner = BattleThread(battle, turns_per_second=self.speed)
+        self.announced = False
+        self.log_turn = 0
+        self.auto_btn.configure(text="Auto Run")
+        self.cosmic_label.configure(text="Cosmic Event: None")
+        self.runner.start()
 
     def next_turn(self):
-        alive_entities = [e for e in self.entities if e.is_alive()]
-        if self.turn >= self.max_turns or len(alive_entities) <= 1:
-            self.end_battle()
-            return
-
-        self.turn += 1
-        self.log(f"\n-- Turn {self.turn} --")
-        event = self.cosmic.apply_event(*self.entities[:2], *self.gods.values())
-        if event:
-            self.cosmic_label.configure(text=f"Cosmic Event: {event.name}")
-            self.log(f"*** Cosmic Event: {event.name} - {event.description} ***")
-
-        for entity in self.entities:
-            if not entity.is_alive():
-                continue
-            opponents = [e for e in self.entities if e != entity and e.is_alive()]
-            if opponents:
-                target = random.choice(opponents)
-                entity.take_turn(target)
-
-        favored_target = self.entity1
-        possible_targets = [e for e in self.entities if e != favored_target and e.is_alive()]
-        for god in self.gods.values():
-            if possible_targets:
-                god_opponent = random.choice(possible_targets)
-                god.influence_battle(favored_target, god_opponent)
-
-        self.update_stats()
-
-        if len([e for e in self.entities if e.is_alive()]) <= 1:
-            self.end_battle()
+        if self.runner.is_alive():
+            self.runner.step_once()
 
     def toggle_auto(self):
-        self.running = not self.running
-        self.auto_btn.configure(text="Pause" if self.running else "Auto Run")
-        if self.running:
-            self.run_auto()
-
-    def run_auto(self):
-        if self.running and len([e for e in self.entities if e.is_alive()]) > 1:
-            self.next_turn()
-            self.after(1000, self.run_auto)
+        if self.runner.running:
+            self.runner.pause()
+        elif self.runner.is_alive():
+            self.runner.resume()
+        self.auto_btn.configure(text="Pause" if self.runner.running else "Auto Run")
+
+    def set_speed(self, value):
+        self.speed = SPEEDS[int(round(value))]
+        self.speed_label.configure(text=f"Speed: {self.speed}/s" if self.speed else "Speed: max")
+        if self.runner:
+            self.runner.set_speed(self.speed)
+
+    def set_roster(self, choice):
+        self.roster_factory = ROSTER_CHOICES[choice]
+        self.reset()
+
+    def set_max_turns(self, value):
+        self.max_turns = int(value)
+        self.reset()
 
     def reset(self):
-        self.entity1 = Priest("High Priest Tenzin", gods=self.gods, logger=self.log)
-        self.entity2 = Entity("Entity2", logger=self.log)
-        self.entity3 = Mechanist("Arthur 2.0", logger=self.log)
-        self.entity4 = Intern("Intern Greg", logger=self.log)
-        self.entities = [self.entity1, self.entity2, self.entity3, self.entity4]
-
-        self.turn = 0
-        self.running = False
+        self.log_pending = []
+        self.log_lines = 0
         self.log_box.delete("1.0", "end")
+        self.new_battle()
+
+    # -----------------------------------------------------
+    # Rendering, once per frame
+    # -----------------------------------------------------
+    def poll(self):
+        lines = []
+        try:
+            while True:
+                lines.append(self.log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        for turn, text in lines[-LOG_MAX_LINES:]:
+            if turn != self.log_turn:
+                self.log_turn = turn
+                self.log_pending.append(f"\n-- Turn {turn} --")
+            self.log_pending.append(text)
+        self.flush_log()
+
+        snapshot = self.runner.latest()
+        if snapshot:
+            self.render(snapshot)
+            if snapshot.over and not self.announced:
+                self.announced = True
+                self.end_battle(snapshot)
+        self.after(FRAME_MS, self.poll)
 
-        for frame in self.status_widgets:
-            frame.destroy()
-        self.status_widgets = []
-
-        for i, entity in enumerate(self.entities):
-            frame = self.create_status_frame(self.status_frame, entity)
-            frame.grid(row=i//2, column=i%2, padx=10, pady=10, sticky="nsew")
-            self.status_widgets.append(frame)
+    def log(self, text):
+        # Shown with the next frame, in one insert with everything else queued
+        self.log_pending.append(text)
 
-        self.update_stats()
-        self.cosmic_label.configure(text="Cosmic Event: None")
+    def flush_log(self):
+        if not self.log_pending:
+            return
+        text = "\n".join(self.log_pending[-LOG_MAX_LINES:]) + "\n"
+        self.log_lines += text.count("\n")
+        self.log_pending = []
+        self.log_box.insert("end", text)
+        if self.log_lines > LOG_MAX_LINES:
+            excess = self.log_lines - LOG_MAX_LINES
+            self.log_box.delete("1.0", f"{excess + 1}.0")
+            self.log_lines -= excess
+        self.log_box.see("end")
 
-    def end_battle(self):
-        alive = [e for e in self.entities if e.is_alive()]
-        if len(alive) == 1:
-            winner = alive[0].name
-        elif len(alive) == 0:
+    def render(self, snapshot):
+        self.last_snapshot = snapshot
+        self.turn_label.configure(text=f"Turn {snapshot.turn}/{snapshot.max_turns}")
+        if snapshot.cosmic_event:
+            self.cosmic_label.configure(text=f"Cosmic Event: {snapshot.cosmic_event}")
+        self.update_roster(snapshot.entities)
+
+    def end_battle(self, snapshot):
+        if snapshot.winner:
+            winner = snapshot.winner
+        elif snapshot.survivors == 0:
             winner = "No one"
         else:
             winner = "No one (stalemate)"
-        self.log(f"\n*** {winner} wins after {self.turn} turns! ***")
+        self.auto_btn.configure(text="Auto Run")
+        self.log(f"\n*** {winner} wins after {snapshot.turn} turns! ***")
+        self.flush_log()
         messagebox.showinfo("Battle Over", f"{winner} is victorious!")
 
 if __name__ == "__main__":